@@ -1,9 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import neurokit2 as nk
 from scipy import signal
 import os
 import csv
+from concurrent.futures import ProcessPoolExecutor
+from utils.beat_table import beats_from_neurokit_info
+from utils.annotation_io import write_beat_annotations, save_beat_table
+
+# neurokit2, matplotlib, wfdb는 import 비용이 커서 사용하는 함수 안에서 import
+# (annotation만 저장하는 worker는 matplotlib을 import하지 않음)
 
 def preprocess_ecg(ecg_signal, sampling_rate, amplification_factor=5):
     b, a = signal.butter(3, [0.5, 40], btype='bandpass', fs=sampling_rate)
@@ -43,12 +47,15 @@ def find_s_peaks(ecg_signal, r_peaks):
 
 def find_t_offsets_tangent(ecg_signal, r_peaks, t_peaks):
     t_offsets = []
-    for i, t_peak in enumerate(t_peaks):
-        if i == len(r_peaks) - 1:  # 마지막 T-peak
+    # T-peak이 빠진 비트가 있어도 index가 어긋나지 않도록 T-peak 위치 기준으로 다음 R-peak 탐색
+    r_peaks = np.asarray(r_peaks)
+    next_index = np.searchsorted(r_peaks, t_peaks, side='right')
+    for t_peak, i in zip(t_peaks, next_index):
+        if i >= len(r_peaks):  # 마지막 R-peak 이후의 T-peak
             next_r_peak = len(ecg_signal) - 1
         else:
-            next_r_peak = r_peaks[i+1]
-        
+            next_r_peak = r_peaks[i]
+
         segment = ecg_signal[t_peak:next_r_peak]
         
         try:
@@ -75,7 +82,102 @@ def calculate_qtc_intervals(q_onsets, toffsets, rpeaks, fs):
         qtc_intervals.append(qtc * 1000)
     return np.array(qtc_intervals)
 
+def detect_beats(ecg_signal, fs):
+    # 한 채널 전체에 대해 fiducial 검출 후 beat array(BEAT_DTYPE) 생성
+    # nk.ecg_process의 sample 단위 DataFrame(ECG_Raw/Clean/Rate/Quality/Phase ...)은 만들지 않고
+    # 같은 단계(clean -> peaks -> delineate)의 info dict만 사용
+    import neurokit2 as nk
+
+    cleaned = nk.ecg_clean(ecg_signal, sampling_rate=fs)
+    _, info = nk.ecg_peaks(cleaned, sampling_rate=fs, correct_artifacts=True)
+    rpeaks = safe_peak_extraction(info, 'ECG_R_Peaks')
+    if len(rpeaks) == 0:
+        return None
+
+    _, waves = nk.ecg_delineate(cleaned, info, sampling_rate=fs)
+    info.update(waves)
+    tpeaks = safe_peak_extraction(info, 'ECG_T_Peaks')
+    return beats_from_neurokit_info(
+        info, fs,
+        q_onsets=find_q_onsets(ecg_signal, rpeaks),
+        s_peaks=find_s_peaks(ecg_signal, rpeaks),
+        t_offsets=find_t_offsets_tangent(ecg_signal, rpeaks, tpeaks),
+    )
+
+def annotate_recording(file_path, save_dir, fs=125, channel=0, amplification_factor=5):
+    # 전체 레코딩의 fiducial을 WFDB annotation(.ann)과 beat table(.npy)로 저장 (이미지 렌더링 없음)
+    data = np.loadtxt(file_path)
+    if len(data.shape) == 1:
+        data = data.reshape(-1, 1)
+
+    ecg_signal = preprocess_ecg(data[:, channel], fs, amplification_factor)
+    beats = detect_beats(ecg_signal, fs)
+    if beats is None:
+        print(f"No R-peaks detected in {file_path}. Skipping this file.")
+        return None
+
+    base_filename = os.path.splitext(os.path.basename(file_path))[0]
+    ann_path = write_beat_annotations(base_filename, beats, save_dir)
+    save_beat_table(beats, os.path.join(save_dir, f"{base_filename}_beats.npy"))
+    return ann_path
+
+def annotate_wfdb_record(record_path, save_dir, channel=0, amplification_factor=5):
+    # SIG / WFDB 레코드용 : 샘플링 레이트는 헤더에서 읽음
+    import wfdb
+
+    record = wfdb.rdrecord(record_path, channels=[channel])
+    fs = record.fs
+
+    ecg_signal = preprocess_ecg(record.p_signal[:, 0], fs, amplification_factor)
+    beats = detect_beats(ecg_signal, fs)
+    if beats is None:
+        print(f"No R-peaks detected in {record_path}. Skipping this record.")
+        return None
+
+    record_name = os.path.basename(record_path)
+    ann_path = write_beat_annotations(record_name, beats, save_dir)
+    save_beat_table(beats, os.path.join(save_dir, f"{record_name}_beats.npy"))
+    return ann_path
+
+def annotate_batch(file_paths, save_dir, fs=125, channel=0, workers=None):
+    os.makedirs(save_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(annotate_recording, path, save_dir, fs, channel) for path in file_paths]
+        return [future.result() for future in futures]
+
+def render_recording(file_path, save_dir, fs=125, seconds=30, amplification_factor=5, dpi=100):
+    # 빠른 렌더링 모드 : 프로세스당 하나의 Agg figure를 재사용하고 긴 구간은 min/max decimation
+    from utils.render import get_renderer
+
+    data = np.loadtxt(file_path)
+    if len(data.shape) == 1:
+        data = data.reshape(-1, 1)
+    if seconds is not None:
+        data = data[:seconds*fs]
+
+    renderer = get_renderer(figsize=(20, 5), dpi=dpi)
+    base_filename = os.path.splitext(os.path.basename(file_path))[0]
+    length = f"{seconds}sec" if seconds is not None else "full"
+
+    save_paths = []
+    for i in range(data.shape[1]):
+        ecg_signal = preprocess_ecg(data[:, i], fs, amplification_factor)
+        beats = detect_beats(ecg_signal, fs)
+        save_path = os.path.join(save_dir, f"{base_filename}_channel_{i+1}_{length}.png")
+        title = f'ECG Signal with Q-onsets, R, S, T peaks and T offsets (Channel {i+1}, {length})'
+        save_paths.append(renderer.render(ecg_signal, fs, save_path, beats=beats, title=title))
+    return save_paths
+
+def render_batch(file_paths, save_dir, fs=125, seconds=30, workers=None):
+    os.makedirs(save_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render_recording, path, save_dir, fs, seconds) for path in file_paths]
+        return [future.result() for future in futures]
+
 def main():
+    import matplotlib.pyplot as plt
+    import neurokit2 as nk
+
     try:
         # 파일 경로 설정
         file_path = r"C:\Users\구시영\OneDrive\바탕 화면\AI연구\holter data\child_sample\preprocssing\preprocessed_155_3_74895083.txt"
@@ -0,0 +1,230 @@
+import os
+import glob
+import argparse
+import tomllib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# 각 subcommand에 필요한 backend(wfdb, neurokit2, fitz ...)는 작업 함수 안에서 import
+# (--help나 가벼운 subcommand, process pool worker가 쓰지 않는 backend를 import하지 않도록)
+
+# 설정 파일 기본값 (config 파일의 [general] 및 각 subcommand 섹션으로 덮어씀)
+DEFAULTS = {
+    'workers': os.cpu_count(),
+    'chunk_size': 125 * 60 * 10,
+    'output_format': 'csv',
+    'channel': 0,
+    'allow_elapsed': False,
+}
+
+
+def load_config(path):
+    # TOML(.toml) 또는 YAML(.yaml/.yml) 설정 파일 읽기
+    if path is None:
+        return {}
+    if path.endswith('.toml'):
+        with open(path, 'rb') as fr:
+            return tomllib.load(fr)
+    if path.endswith(('.yaml', '.yml')):
+        import yaml
+        with open(path, 'r', encoding='utf-8') as fr:
+            return yaml.safe_load(fr) or {}
+    raise ValueError(f"지원하지 않는 설정 파일 형식입니다. path : {path}")
+
+
+def resolve_options(config, command, args):
+    # 우선순위 : 명령행 인자 > [command] 섹션 > [general] 섹션 > 기본값
+    options = dict(DEFAULTS)
+    options.update(config.get('general', {}))
+    options.update(config.get(command, {}))
+    options.update({key: value for key, value in vars(args).items() if value is not None})
+    return options
+
+
+def expand_records(patterns):
+    # glob 패턴 / .hea 경로 목록 -> 확장자 없는 WFDB 레코드 경로
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    records = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            records.append(os.path.splitext(path)[0])
+    if not records:
+        raise FileNotFoundError(f"처리할 레코드가 없습니다. records : {patterns}")
+    return records
+
+
+def record_hookup(record_path, xml_dir=None, allow_elapsed=False):
+    # hookup 시각 : 같은 이름의 report XML -> 레코드 헤더 base time 순으로 찾음
+    # 둘 다 없으면 실패 (allow_elapsed를 켠 경우에만 경과 시간 기준(00:00)으로 계산, 결과의 Hour는 실제 시각이 아님)
+    import wfdb
+    from utils.xml_to_csv import read_hookup_datetime
+
+    if xml_dir is not None:
+        xml_path = os.path.join(xml_dir, f"{os.path.basename(record_path)}.xml")
+        if os.path.exists(xml_path):
+            return read_hookup_datetime(xml_path)
+    header = wfdb.rdheader(record_path)
+    if header.base_datetime is not None:
+        return header.base_datetime
+    if not allow_elapsed:
+        raise ValueError(f"hookup 시각을 찾을 수 없습니다. (report XML / 헤더 base time 없음, 경과 시간 기준 출력은 --allow-elapsed) record : {record_path}")
+    print(f"Warning: hookup 시각이 없어 경과 시간 기준(00:00 시작)으로 계산합니다. Hour는 실제 시각이 아닙니다. record : {record_path}")
+    return datetime(2000, 1, 1)
+
+
+def record_beats(record_path, channel):
+    # 샘플링 레이트는 레코드 헤더에서 읽음
+    import wfdb
+    from ecg_annotation_save_full_ampdc import preprocess_ecg, detect_beats
+
+    record = wfdb.rdrecord(record_path, channels=[channel])
+    ecg_signal = preprocess_ecg(record.p_signal[:, 0], record.fs)
+    beats = detect_beats(ecg_signal, record.fs)
+    # 결과 파일 없이 성공으로 끝나지 않도록 R-peak이 없으면 실패 처리
+    if beats is None:
+        raise ValueError(f"R-peak이 검출되지 않았습니다. record : {record_path}, channel : {channel}")
+    return beats, record.fs
+
+
+def save_table(table, output_dir, name, output_format, index=False):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{name}.{output_format}")
+    if output_format == 'csv':
+        table.to_csv(path, index=index)
+    elif output_format == 'parquet':
+        table.to_parquet(path, index=index)
+    else:
+        raise ValueError(f"지원하지 않는 출력 형식입니다. output_format : {output_format}")
+    return path
+
+
+# ---- subcommand 작업 (process pool worker에서 레코드 단위로 실행) ----
+
+def hr_task(record_path, options):
+    from utils.hourly_summary import compute_hourly_summary
+
+    beats, fs = record_beats(record_path, options['channel'])
+    hookup_dt = record_hookup(record_path, options.get('xml_dir'), options['allow_elapsed'])
+    summary = compute_hourly_summary(beats, fs, hookup_dt, pause_threshold=options.get('pause_threshold', 2.0))
+    return save_table(summary, options['output_dir'], f"{os.path.basename(record_path)}_hourly_hr", options['output_format'])
+
+
+def qtc_task(record_path, options):
+    from utils.rolling_stats import rolling_qtc_hr
+
+    beats, fs = record_beats(record_path, options['channel'])
+    hookup_dt = record_hookup(record_path, options.get('xml_dir'), options['allow_elapsed'])
+    trend = rolling_qtc_hr(beats, fs, window=options.get('window', 30), step=options.get('step', 5), hookup_dt=hookup_dt)
+    return save_table(trend, options['output_dir'], f"{os.path.basename(record_path)}_qtc_hr", options['output_format'], index=True)
+
+
+def annotate_task(record_path, options):
+    from ecg_annotation_save_full_ampdc import annotate_wfdb_record
+
+    os.makedirs(options['output_dir'], exist_ok=True)
+    ann_path = annotate_wfdb_record(record_path, options['output_dir'], channel=options['channel'])
+    if ann_path is None:
+        raise ValueError(f"R-peak이 검출되지 않았습니다. record : {record_path}, channel : {options['channel']}")
+    return ann_path
+
+
+def export_task(record_path, options):
+    from utils.waveform_export import export_waveform
+
+    return export_waveform(record_path, options['output_dir'], fmt=options.get('format', 'xml'),
+                           encoding=options.get('encoding', 'base64'), chunk_size=options['chunk_size'])
+
+
+RECORD_TASKS = {
+    'hr': hr_task,
+    'qtc': qtc_task,
+    'annotate': annotate_task,
+    'export': export_task,
+}
+
+
+def run_records(command, options):
+    records = expand_records(options['records'])
+    task = RECORD_TASKS[command]
+    print(f"{command} : 레코드 {len(records)}개 처리 시작 (workers={options['workers']})")
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+        futures = {executor.submit(task, record, options): record for record in records}
+        for future, record in futures.items():
+            try:
+                print(f"Processed {record} -> {future.result()}")
+            except Exception as e:
+                print(f"Failed to process {record}: {e}")
+                failed.append(record)
+    return failed
+
+
+def run_ingest_reports(options):
+    from utils.report_to_xml import process_pdf_files
+
+    input_dirs = options['input_dirs']
+    if isinstance(input_dirs, str):
+        input_dirs = [input_dirs]
+    os.makedirs(options['output_dir'], exist_ok=True)
+    return process_pdf_files(input_dirs, options['output_dir'])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Holter 분석 파이프라인")
+    parser.add_argument('--config', help="TOML / YAML 설정 파일")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest-reports', help="Holter report PDF -> XML")
+    ingest.add_argument('--input-dirs', dest='input_dirs', nargs='+')
+    ingest.add_argument('--output-dir', dest='output_dir')
+
+    for command, help_text in [('hr', "시간대별 HR summary"), ('qtc', "QTc / HR sliding window 추이"),
+                               ('annotate', "WFDB annotation(.ann) + beat table 저장"),
+                               ('export', "파형 XML / JSON 내보내기")]:
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument('--records', nargs='+', help="WFDB 레코드 (.hea glob 패턴)")
+        sub.add_argument('--output-dir', dest='output_dir')
+        sub.add_argument('--workers', type=int)
+        sub.add_argument('--channel', type=int)
+        if command in ('hr', 'qtc'):
+            sub.add_argument('--xml-dir', dest='xml_dir', help="hookup 시각을 읽을 report XML 디렉토리")
+            sub.add_argument('--output-format', dest='output_format', choices=['csv', 'parquet'])
+            sub.add_argument('--allow-elapsed', dest='allow_elapsed', action='store_const', const=True,
+                             help="hookup 시각이 없는 레코드를 경과 시간 기준으로 계산 (Hour가 실제 시각이 아님)")
+        if command == 'qtc':
+            sub.add_argument('--window', type=float)
+            sub.add_argument('--step', type=float)
+        if command == 'export':
+            sub.add_argument('--format', choices=['xml', 'json'])
+            sub.add_argument('--encoding', choices=['base64', 'text'])
+            sub.add_argument('--chunk-size', dest='chunk_size', type=int)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    config = load_config(args.config)
+    command = args.command
+    del args.config, args.command
+
+    options = resolve_options(config, command, args)
+    for key in ['input_dirs', 'output_dir'] if command == 'ingest-reports' else ['records', 'output_dir']:
+        if key not in options:
+            raise SystemExit(f"'{key}' 설정이 필요합니다. (--{key.replace('_', '-')} 또는 config [{command}] 섹션)")
+
+    if command == 'ingest-reports':
+        failed = run_ingest_reports(options)
+    else:
+        failed = run_records(command, options)
+
+    if failed:
+        print("\nFailed to process the following files:")
+        for failed_file in failed:
+            print(failed_file)
+        # scheduler가 실패를 알 수 있도록 0이 아닌 종료 코드
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import os
+import json
+import glob
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.report_to_xml import process_pdf_file
+from ecg_annotation_save_full_ampdc import annotate_wfdb_record
+
+def ingest_report(pdf_path, output_dir):
+    return process_pdf_file(pdf_path, output_dir)
+
+def ingest_sig(hea_path, output_dir):
+    # SIG export는 .hea 헤더 기준으로 같은 이름의 신호 파일과 함께 처리
+    return annotate_wfdb_record(os.path.splitext(hea_path)[0], output_dir)
+
+# 감시할 파일 확장자 -> (처리 함수, 결과 하위 디렉토리)
+HANDLERS = {
+    '.pdf': (ingest_report, 'xml'),
+    '.hea': (ingest_sig, 'annotation'),
+}
+
+
+def _handle(path, results_dir):
+    # process pool에서 실행되는 CPU 작업
+    handler, sub_dir = HANDLERS[os.path.splitext(path)[1].lower()]
+    output_dir = os.path.join(results_dir, sub_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    return handler(path, output_dir)
+
+
+class IngestService:
+    # 감시 디렉토리를 주기적으로 스캔해서 새 파일을 queue에 넣고, process pool에서 처리
+    # - debounce : 크기/수정 시각이 settle_time 동안 변하지 않은 파일만 처리 (복사 중인 파일 제외)
+    # - backpressure : queue가 가득 차면 스캔을 멈추고 worker가 처리할 때까지 대기
+    # - 처리 결과는 파일 signature와 함께 기록 : 같은 이름으로 다시 export되거나 실패한 파일이 바뀌면 다시 처리
+    def __init__(self, watch_dirs, results_dir, workers=4, max_pending=64, poll_interval=2.0, settle_time=5.0):
+        self.watch_dirs = watch_dirs
+        self.results_dir = results_dir
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.queue = asyncio.Queue(maxsize=max_pending)
+
+        self.ledger_path = os.path.join(results_dir, 'ingested.jsonl')
+        self.done = self._load_ledger()     # path -> 처리 성공 시점의 signature
+        self.failed = {}                    # path -> 처리 실패 시점의 signature (파일이 바뀌면 다시 시도)
+        self.pending = set()
+        self.snapshots = {}     # path -> (signature, 안정 상태 시작 시각)
+
+    def _load_ledger(self):
+        # 재시작 시 이미 처리한 파일은 건너뜀 (실패한 파일은 재시작 시 다시 시도)
+        done = {}
+        if os.path.exists(self.ledger_path):
+            with open(self.ledger_path, 'r', encoding='utf-8') as fr:
+                for line in fr:
+                    entry = json.loads(line)
+                    if entry['status'] == 'done':
+                        done[entry['path']] = tuple(tuple(item) for item in entry.get('signature') or [])
+        return done
+
+    def _record_result(self, path, signature, status, output=None, error=None):
+        with open(self.ledger_path, 'a', encoding='utf-8') as fw:
+            fw.write(json.dumps({'path': path, 'status': status, 'output': output, 'error': error,
+                                 'signature': signature, 'time': time.strftime('%Y-%m-%d %H:%M:%S')}) + '\n')
+
+    @staticmethod
+    def _signature(path):
+        # 같은 이름의 모든 파일(.hea + 신호 파일 등)의 크기/수정 시각
+        stem = os.path.splitext(path)[0]
+        signature = []
+        for name in sorted(glob.glob(f"{glob.escape(stem)}.*")):
+            stat = os.stat(name)
+            signature.append((name, stat.st_size, stat.st_mtime))
+        if not signature:
+            raise FileNotFoundError(path)
+        return tuple(signature)
+
+    def _candidates(self):
+        for watch_dir in self.watch_dirs:
+            for root, _, files in os.walk(watch_dir):
+                for file in files:
+                    if os.path.splitext(file)[1].lower() in HANDLERS:
+                        yield os.path.join(root, file)
+
+    def _settled_signature(self, path, now):
+        # settle_time 동안 변하지 않았으면 signature, 아니면 None
+        try:
+            signature = self._signature(path)
+        except FileNotFoundError:
+            self.snapshots.pop(path, None)
+            return None
+
+        previous = self.snapshots.get(path)
+        if previous is None or previous[0] != signature:
+            self.snapshots[path] = (signature, now)
+            return None
+        return signature if now - previous[1] >= self.settle_time else None
+
+    def _scan_once(self, now):
+        # 디렉토리 탐색 / stat (event loop 밖의 thread에서 실행) -> 처리할 (path, signature) 목록
+        ready = []
+        for path in self._candidates():
+            if path in self.pending:
+                continue
+            signature = self._settled_signature(path, now)
+            if signature is None:
+                continue
+            # 처리 이후 바뀌지 않은 파일은 건너뜀 (signature 없는 이전 ledger 항목은 경로만으로 판단)
+            if self.done.get(path) in ((), signature) or self.failed.get(path) == signature:
+                continue
+            self.snapshots.pop(path, None)
+            ready.append((path, signature))
+        return ready
+
+    async def scan(self):
+        while True:
+            ready = await asyncio.to_thread(self._scan_once, time.monotonic())
+            for path, signature in ready:
+                self.pending.add(path)
+                await self.queue.put((path, signature))
+            await asyncio.sleep(self.poll_interval)
+
+    async def worker(self, executor):
+        loop = asyncio.get_running_loop()
+        while True:
+            path, signature = await self.queue.get()
+            try:
+                output = await loop.run_in_executor(executor, _handle, path, self.results_dir)
+                self._record_result(path, signature, 'done', output=output)
+                self.done[path] = signature
+                self.failed.pop(path, None)
+                print(f"Processed {path} -> {output}")
+            except Exception as e:
+                # 실패한 파일은 signature가 바뀌면(예: .dat가 늦게 도착, 재export) 다시 처리
+                self._record_result(path, signature, 'failed', error=str(e))
+                self.failed[path] = signature
+                print(f"Failed to process {path}: {e}")
+            finally:
+                self.pending.discard(path)
+                self.queue.task_done()
+
+    async def run(self):
+        os.makedirs(self.results_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            tasks = [asyncio.create_task(self.worker(executor)) for _ in range(self.workers)]
+            tasks.append(asyncio.create_task(self.scan()))
+            await asyncio.gather(*tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Holter export 폴더 감시 및 자동 변환 서비스")
+    parser.add_argument('--watch', nargs='+', required=True, help="감시할 디렉토리")
+    parser.add_argument('--results', required=True, help="결과 저장 디렉토리")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    parser.add_argument('--settle-time', type=float, default=5.0)
+    args = parser.parse_args()
+
+    service = IngestService(args.watch, args.results, args.workers, args.max_pending,
+                            args.poll_interval, args.settle_time)
+    print(f"Watching {args.watch} -> {args.results}")
+    asyncio.run(service.run())
+
+if __name__ == "__main__":
+    main()
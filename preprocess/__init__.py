@@ -1 +1,26 @@
-from .ECGdeli import *
\ No newline at end of file
+# ECGdeli는 처음 접근할 때 import (로컬에만 있는 모듈이라 없어도 preprocess 패키지 import는 가능)
+import importlib
+
+
+def _ecgdeli():
+    try:
+        return importlib.import_module('.ECGdeli', __name__)
+    except ModuleNotFoundError as e:
+        if e.name != f'{__name__}.ECGdeli':
+            raise
+        return None
+
+
+def __getattr__(name):
+    # 기존 'from .ECGdeli import *'와 같이 ECGdeli의 공개 이름을 preprocess에서 바로 사용
+    module = _ecgdeli() if not name.startswith('_') else None
+    if module is not None and hasattr(module, name):
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    try:
+        return importlib.import_module(f'.{name}', __name__)
+    except ModuleNotFoundError as e:
+        if e.name != f'{__name__}.{name}':
+            raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
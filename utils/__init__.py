@@ -1,3 +1,54 @@
-from .report_to_xml import *
-from .utils import *
-from .xml_to_csv import *
+# 하위 모듈은 처음 접근할 때 import (fitz, tabula, PyPDF2, matplotlib, wfdb 등을 쓰지 않는 도구는 import 비용 없음)
+# 예) from utils.xml_to_csv import xml_to_csv, from utils import read_hookup_datetime -> xml_to_csv 모듈만 import
+import importlib
+
+# xml_to_csv는 표준 라이브러리만 쓰므로 바로 import
+# (하위 모듈과 같은 이름의 xml_to_csv 함수를 패키지 속성으로 고정 : 나중에 'import utils.xml_to_csv'를 해도 함수 유지)
+from .xml_to_csv import preprocessing_tag_list, xml_to_csv, read_hookup_datetime
+
+# 공개 이름 -> 정의된 하위 모듈
+_LAZY_ATTRS = {
+    # report_to_xml
+    'extract_match': 'report_to_xml',
+    'extract_grouped_matches': 'report_to_xml',
+    'parse_general_section': 'report_to_xml',
+    'parse_heart_rates_section': 'report_to_xml',
+    'parse_section': 'report_to_xml',
+    'create_xml': 'report_to_xml',
+    'process_pdf_file': 'report_to_xml',
+    'process_pdf_files': 'report_to_xml',
+    # utils
+    'save_pickle': 'utils',
+    'load_pickle': 'utils',
+    'read_hourly_summary': 'utils',
+    'iter_hourly_summaries': 'utils',
+    'convert_pdf_to_dict': 'utils',
+    'plot_from_SIG': 'utils',
+    'read_event_labels': 'utils',
+    'iter_segments_from_SIG': 'utils',
+    'iter_segments_batch': 'utils',
+    'get_segments_from_SIG': 'utils',
+}
+
+__all__ = list(_LAZY_ATTRS) + ['preprocessing_tag_list', 'xml_to_csv', 'read_hookup_datetime']
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module_name = _LAZY_ATTRS[name]
+        module = importlib.import_module(f'.{module_name}', __name__)
+        # 같은 모듈의 공개 이름을 한 번에 바인딩
+        for attr, owner in _LAZY_ATTRS.items():
+            if owner == module_name:
+                globals()[attr] = getattr(module, attr)
+        return globals()[name]
+    try:
+        return importlib.import_module(f'.{name}', __name__)
+    except ModuleNotFoundError as e:
+        if e.name != f'{__name__}.{name}':
+            raise
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
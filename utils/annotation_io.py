@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .beat_table import beat_columns
+
+# WFDB(MIT) annotation 코드 (ecgcodes.h)
+ANN_CODES = {'N': 1, '"': 22, 't': 27, '(': 39, ')': 40}
+SKIP, NUM, AUX = 59, 60, 63
+
+# Beat table fiducial -> (symbol, num, aux)
+# ecgpuwave 관례: '(' / ')' 는 파형 onset / offset, num 1=QRS, 2=T
+# Q/S peak는 표준 코드가 없으므로 note('"') + aux 문자로 기록
+FIDUCIAL_SYMBOLS = {
+    "Q_Onset": ('(', 1, None),
+    "Q_Peak": ('"', 0, 'Q'),
+    "R_Peak": ('N', 0, None),
+    "S_Peak": ('"', 0, 'S'),
+    "T_Peak": ('t', 0, None),
+    "T_Offset": (')', 2, None),
+}
+
+
+def _collect_annotations(beats):
+    # beat table의 fiducial을 (sample, code, num, aux) 배열로 펼친 뒤 sample 순 정렬
+    columns = beat_columns(beats)
+    samples, codes, nums, auxs = [], [], [], []
+    for column, (symbol, num, aux) in FIDUCIAL_SYMBOLS.items():
+        if column not in columns:
+            continue
+        position = np.asarray(beats[column], dtype=np.int64)
+        position = position[position >= 0]
+        samples.append(position)
+        codes.append(np.full(len(position), ANN_CODES[symbol], dtype=np.int64))
+        nums.append(np.full(len(position), num, dtype=np.int64))
+        auxs.append(np.full(len(position), ord(aux) if aux else 0, dtype=np.int64))
+
+    if not samples:
+        raise ValueError("beat table에 fiducial 컬럼이 없습니다.")
+    samples = np.concatenate(samples)
+    order = np.argsort(samples, kind='stable')
+    return samples[order], np.concatenate(codes)[order], np.concatenate(nums)[order], np.concatenate(auxs)[order]
+
+
+def encode_annotations(samples, codes, nums, auxs):
+    # MIT annotation format을 numpy로 한 번에 인코딩 (annotation당 python loop 없음)
+    # annotation 1개 = [SKIP 3 words] + 본 word + [NUM word] + [AUX 2 words]
+    diffs = np.diff(samples, prepend=0)
+    has_skip = diffs > 1023
+    prev_nums = np.concatenate([[0], nums[:-1]])
+    has_num = nums != prev_nums
+    has_aux = auxs > 0
+
+    n_words = 1 + 3 * has_skip + has_num + 2 * has_aux
+    start = np.concatenate([[0], np.cumsum(n_words)])
+    words = np.zeros(start[-1] + 1, dtype=np.uint16)   # 마지막 0 word는 파일 끝 표시
+
+    # SKIP : 32bit 간격을 PDP-11 순서(상위 16bit 먼저)로 기록하고 본 word의 간격은 0
+    pos = start[:-1][has_skip]
+    skip_diffs = diffs[has_skip]
+    words[pos] = SKIP << 10
+    words[pos + 1] = (skip_diffs >> 16) & 0xFFFF
+    words[pos + 2] = skip_diffs & 0xFFFF
+
+    main = start[:-1] + 3 * has_skip
+    words[main] = (codes << 10) | np.where(has_skip, 0, diffs)
+
+    pos = (main + 1)[has_num]
+    words[pos] = (NUM << 10) | (nums[has_num] & 0x3FF)
+
+    # AUX : 길이 1 문자열 + padding
+    pos = (main + 1 + has_num)[has_aux]
+    words[pos] = (AUX << 10) | 1
+    words[pos + 1] = auxs[has_aux]
+
+    return words.astype('<u2').tobytes()
+
+
+# 검출된 fiducial을 WFDB annotation 파일(<record_name>.<extension>)로 저장
+def write_beat_annotations(record_name, beats, write_dir='.', extension='ann'):
+    samples, codes, nums, auxs = _collect_annotations(beats)
+    ann_path = os.path.join(write_dir, f"{record_name}.{extension}")
+    with open(ann_path, 'wb') as fw:
+        fw.write(encode_annotations(samples, codes, nums, auxs))
+    return ann_path
+
+
+# Beat table 바이너리(.npy) 저장 / 불러오기
+def save_beat_table(beats, path):
+    if isinstance(beats, pd.DataFrame):
+        beats = beats.to_records(index=False)
+    np.save(path, beats, allow_pickle=False)
+
+
+def load_beat_table(path):
+    return np.load(path, allow_pickle=False)
+
+
+def _export_one(args):
+    record_name, beats, write_dir, extension = args
+    ann_path = write_beat_annotations(record_name, beats, write_dir, extension)
+    save_beat_table(beats, os.path.join(write_dir, f"{record_name}_beats.npy"))
+    return ann_path
+
+
+# 여러 레코드의 annotation / beat table 일괄 저장
+# records : [(record_name, beat_table), ...]
+def export_annotations(records, write_dir, extension='ann', workers=None):
+    if not isinstance(records, list):
+        raise TypeError("records는 리스트 타입이어야 합니다.")
+    os.makedirs(write_dir, exist_ok=True)
+
+    tasks = [(record_name, beats, write_dir, extension) for record_name, beats in records]
+    if workers == 1:
+        return [_export_one(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_export_one, tasks))
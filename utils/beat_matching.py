@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# WFDB beat annotation 심볼 -> AAMI beat class
+BEAT_CLASSES = {
+    'N': 'N', 'L': 'N', 'R': 'N', 'e': 'N', 'j': 'N',
+    'A': 'S', 'a': 'S', 'J': 'S', 'S': 'S',
+    'V': 'V', 'E': 'V',
+    'F': 'F',
+    '/': 'Q', 'f': 'Q', 'Q': 'Q',
+}
+
+
+# 레퍼런스(.ann)에서 beat annotation만 추출
+def read_reference_beats(record_name, extension='ann'):
+    import wfdb
+
+    annotation = wfdb.rdann(record_name, extension)
+    symbols = np.asarray(annotation.symbol)
+    is_beat = np.isin(symbols, list(BEAT_CLASSES))
+    classes = pd.Series(symbols[is_beat]).map(BEAT_CLASSES).to_numpy()
+    return annotation.sample[is_beat].astype(np.int64), classes, annotation.fs
+
+
+def _nearest_pass(detected, reference, tolerance):
+    # 레퍼런스마다 가장 가까운 검출 비트를 찾고, 같은 검출 비트에 여러 레퍼런스가 걸리면 거리가 가장 짧은 레퍼런스만 매칭
+    # 반환 : 매칭된 레퍼런스 위치, 해당 검출 비트 위치
+    right = np.clip(np.searchsorted(detected, reference), 0, len(detected) - 1)
+    left = np.clip(right - 1, 0, len(detected) - 1)
+    use_left = np.abs(detected[left] - reference) <= np.abs(detected[right] - reference)
+    nearest = np.where(use_left, left, right)
+    distance = np.abs(detected[nearest] - reference)
+
+    order = np.lexsort((distance, nearest))
+    order = order[distance[order] <= tolerance]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = nearest[order][1:] != nearest[order][:-1]
+    winner = order[first]
+    return winner, nearest[winner]
+
+
+# 검출 비트와 레퍼런스 비트를 tolerance 내에서 1:1 매칭
+# 정렬된 배열 + searchsorted로 O(n log n)
+# 중복 매칭에서 밀린 레퍼런스는 아직 매칭되지 않은 검출 비트들과 다시 매칭 (tolerance 내에 다른 검출 비트가 있으면 TP)
+def match_beats(detected, reference, tolerance):
+    detected = np.sort(np.asarray(detected, dtype=np.int64))
+    reference = np.asarray(reference, dtype=np.int64)
+    matched_ref = np.zeros(len(reference), dtype=bool)
+    matched_det = np.full(len(reference), -1, dtype=np.int64)
+
+    free_det = np.arange(len(detected))
+    open_ref = np.arange(len(reference))
+    while len(free_det) > 0 and len(open_ref) > 0:
+        winner, nearest = _nearest_pass(detected[free_det], reference[open_ref], tolerance)
+        if len(winner) == 0:
+            break
+        matched_ref[open_ref[winner]] = True
+        matched_det[open_ref[winner]] = free_det[nearest]
+        open_ref = np.delete(open_ref, winner)
+        free_det = np.delete(free_det, nearest)
+    return matched_ref, matched_det
+
+
+def _rate(numerator, denominator):
+    # 분모가 0이면 NaN (검출 / 레퍼런스 비트가 없는 레코드, Python int 합계도 float 배열로 변환해서 계산)
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+# 시간대별 / beat class별 Sensitivity, PPV
+def compare_beats(detected, reference, reference_classes, fs, tolerance=0.15):
+    detected = np.sort(np.asarray(detected, dtype=np.int64))
+    reference = np.asarray(reference, dtype=np.int64)
+    matched_ref, matched_det = match_beats(detected, reference, int(round(tolerance * fs)))
+
+    det_is_tp = np.zeros(len(detected), dtype=bool)
+    det_is_tp[matched_det[matched_ref]] = True
+
+    samples_per_hour = int(3600 * fs)
+    ref_hour = reference // samples_per_hour
+    det_hour = detected // samples_per_hour
+    n_hours = int(max(ref_hour.max(initial=-1), det_hour.max(initial=-1))) + 1
+
+    tp = np.bincount(ref_hour, weights=matched_ref, minlength=n_hours)
+    fn = np.bincount(ref_hour, weights=~matched_ref, minlength=n_hours)
+    fp = np.bincount(det_hour, weights=~det_is_tp, minlength=n_hours)
+    hourly = pd.DataFrame({"Hour": np.arange(n_hours), "TP": tp, "FN": fn, "FP": fp}).astype(int)
+    hourly["Sensitivity"] = _rate(hourly["TP"], hourly["TP"] + hourly["FN"])
+    hourly["PPV"] = _rate(hourly["TP"], hourly["TP"] + hourly["FP"])
+
+    # class별로는 FP를 정의할 수 없으므로 Sensitivity만 계산
+    by_class = pd.DataFrame({"Class": reference_classes, "Matched": matched_ref}) \
+        .groupby("Class")["Matched"].agg(["sum", "count"])
+    by_class.columns = ["TP", "Total"]
+    by_class["FN"] = by_class["Total"] - by_class["TP"]
+    by_class["Sensitivity"] = _rate(by_class["TP"], by_class["Total"])
+
+    total_tp, total_fn, total_fp = (int(value) for value in hourly[["TP", "FN", "FP"]].sum())
+    overall = {
+        "TP": total_tp, "FN": total_fn, "FP": total_fp,
+        "Sensitivity": _rate(total_tp, total_tp + total_fn).item(),
+        "PPV": _rate(total_tp, total_tp + total_fp).item(),
+    }
+    return overall, hourly, by_class.reset_index()
+
+
+# 여러 레코드 일괄 검증
+# records : [(pid, detected_r_peaks, reference_record_name), ...]
+def compare_cohort(records, tolerance=0.15, extension='ann', fs=125):
+    overall_rows, hourly_frames, class_frames = [], [], []
+    for pid, detected, record_name in records:
+        reference, classes, ann_fs = read_reference_beats(record_name, extension)
+        overall, hourly, by_class = compare_beats(detected, reference, classes, ann_fs or fs, tolerance)
+        overall_rows.append({"PID": pid, **overall})
+        hourly_frames.append(hourly.assign(PID=pid))
+        class_frames.append(by_class.assign(PID=pid))
+
+    return pd.DataFrame(overall_rows), pd.concat(hourly_frames, ignore_index=True), pd.concat(class_frames, ignore_index=True)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Beat table 컬럼 정의
+# fiducial 위치는 sample index (검출되지 않은 경우 -1), 간격은 ms 단위
+FIDUCIAL_COLUMNS = ["R_Peak", "Q_Onset", "Q_Peak", "S_Peak", "T_Peak", "T_Offset"]
+INTERVAL_COLUMNS = ["RR", "HR", "QT", "QTc"]
+
+# 고정 크기 비트 레코드 (비트당 40 bytes : int32 fiducial 6개 + float32 간격 4개)
+# 24시간 x 3채널(약 30만 비트)도 수 MB (sample 단위 neurokit DataFrame은 수 GB)
+BEAT_DTYPE = np.dtype([(col, np.int32) for col in FIDUCIAL_COLUMNS] + [(col, np.float32) for col in INTERVAL_COLUMNS])
+
+# neurokit info dict key -> make_beat_table 인자
+# (neurokit은 Q-onset을 따로 주지 않으므로 QRS onset(ECG_R_Onsets)을 사용)
+NEUROKIT_KEYS = {
+    "r_peaks": "ECG_R_Peaks",
+    "q_onsets": "ECG_R_Onsets",
+    "q_peaks": "ECG_Q_Peaks",
+    "s_peaks": "ECG_S_Peaks",
+    "t_peaks": "ECG_T_Peaks",
+    "t_offsets": "ECG_T_Offsets",
+}
+
+
+# DataFrame / structured array 모두에서 컬럼명 목록 반환
+def beat_columns(beats):
+    if isinstance(beats, np.ndarray):
+        return beats.dtype.names
+    return beats.columns
+
+
+def _align_to_beats(r_peaks, points, side):
+    # 검출된 fiducial 점들을 각 R-peak(비트)에 할당
+    # side='before' : 이전 R-peak 이후 ~ 현재 R-peak 사이의 마지막 점 (Q-onset, Q-peak)
+    # side='after'  : 현재 R-peak ~ 다음 R-peak 사이의 첫 번째 점 (S-peak, T-peak, T-offset)
+    aligned = np.full(len(r_peaks), -1, dtype=np.int64)
+    if points is None or len(points) == 0 or len(r_peaks) == 0:
+        return aligned
+
+    points = np.asarray(points, dtype=float)
+    points = np.unique(points[~np.isnan(points)].astype(np.int64))
+    if len(points) == 0:
+        return aligned
+
+    if side == 'before':
+        idx = np.searchsorted(points, r_peaks, side='right') - 1
+        bound = np.concatenate([[-1], r_peaks[:-1]])
+        candidate = points[np.clip(idx, 0, None)]
+        valid = (idx >= 0) & (candidate > bound)
+    elif side == 'after':
+        idx = np.searchsorted(points, r_peaks, side='left')
+        bound = np.concatenate([r_peaks[1:], [np.iinfo(np.int64).max]])
+        candidate = points[np.clip(idx, None, len(points) - 1)]
+        valid = (idx < len(points)) & (candidate < bound)
+    else:
+        raise ValueError(f"side는 'before' 또는 'after'여야 합니다. side : {side}")
+
+    aligned[valid] = candidate[valid]
+    return aligned
+
+
+def _beat_fields(r_peaks, fs, q_onsets, q_peaks, s_peaks, t_peaks, t_offsets):
+    r_peaks = np.asarray(r_peaks, dtype=float)
+    r_peaks = np.unique(r_peaks[~np.isnan(r_peaks)].astype(np.int64))
+
+    fields = {
+        "R_Peak": r_peaks,
+        "Q_Onset": _align_to_beats(r_peaks, q_onsets, 'before'),
+        "Q_Peak": _align_to_beats(r_peaks, q_peaks, 'before'),
+        "S_Peak": _align_to_beats(r_peaks, s_peaks, 'after'),
+        "T_Peak": _align_to_beats(r_peaks, t_peaks, 'after'),
+        "T_Offset": _align_to_beats(r_peaks, t_offsets, 'after'),
+    }
+
+    # RR : 직전 R-peak과의 간격 (첫 비트는 NaN)
+    rr = np.full(len(r_peaks), np.nan)
+    rr[1:] = np.diff(r_peaks) / fs * 1000
+    fields["RR"] = rr
+    fields["HR"] = 60000 / rr
+
+    # QT : Q-onset ~ T-offset, QTc : Bazett's formula (직전 RR 사용)
+    q_on, t_off = fields["Q_Onset"], fields["T_Offset"]
+    qt = np.where((q_on >= 0) & (t_off > q_on), (t_off - q_on) / fs * 1000, np.nan)
+    fields["QT"] = qt
+    fields["QTc"] = qt / np.sqrt(rr / 1000)
+    return fields
+
+
+# 검출된 fiducial 배열들로 비트 단위 테이블 생성
+def make_beat_table(r_peaks, fs, q_onsets=None, q_peaks=None, s_peaks=None, t_peaks=None, t_offsets=None):
+    return pd.DataFrame(_beat_fields(r_peaks, fs, q_onsets, q_peaks, s_peaks, t_peaks, t_offsets))
+
+
+# 같은 내용을 BEAT_DTYPE structured array로 생성 (파이프라인 기본 표현, 컬럼명으로 접근)
+def make_beat_array(r_peaks, fs, q_onsets=None, q_peaks=None, s_peaks=None, t_peaks=None, t_offsets=None):
+    fields = _beat_fields(r_peaks, fs, q_onsets, q_peaks, s_peaks, t_peaks, t_offsets)
+    beats = np.empty(len(fields["R_Peak"]), dtype=BEAT_DTYPE)
+    for col, values in fields.items():
+        beats[col] = values
+    return beats
+
+
+# neurokit info dict(nk.ecg_process / ecg_delineate 결과)에서 바로 beat array 생성
+# 직접 검출한 fiducial은 키워드 인자로 덮어씀 (예: q_onsets=find_q_onsets(...))
+def beats_from_neurokit_info(info, fs, **fiducials):
+    unknown = set(fiducials) - set(NEUROKIT_KEYS)
+    if unknown:
+        raise ValueError(f"지원하지 않는 fiducial 인자입니다. : {sorted(unknown)}")
+
+    points = {arg: info.get(key) for arg, key in NEUROKIT_KEYS.items()}
+    points.update(fiducials)
+    r_peaks = points.pop("r_peaks")
+    if r_peaks is None:
+        raise ValueError("info에 ECG_R_Peaks가 없습니다.")
+    return make_beat_array(r_peaks, fs, **points)
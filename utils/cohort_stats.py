@@ -0,0 +1,222 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# 시간대별 HR 분포 (bpm, 1 bpm 단위 histogram)
+HR_RANGE = (0, 300)
+HR_BIN_WIDTH = 1.0
+# 환자 단위 burden / noise 분포 (%, 0.1% 단위 histogram)
+PERCENT_RANGE = (0, 100)
+PERCENT_BIN_WIDTH = 0.1
+
+# Hourly Summary(HR) 테이블에서 분포를 계산할 컬럼
+HOURLY_HR_COLUMNS = ["Min.", "Ave.", "Max."]
+# 시간대별 합계를 계산할 컬럼
+HOURLY_SUM_COLUMNS = ["Min", "#QRS's", "Pauses"]
+# xml_to_csv 결과에서 계산하는 환자 단위 지표 (%)
+REPORT_METRICS = ["V_Burden", "S_Burden", "AFAFLPercentage", "NoisePercentage"]
+
+
+def _n_bins(value_range, bin_width):
+    return int(np.ceil((value_range[1] - value_range[0]) / bin_width)) + 1
+
+
+def _bin_index(values, value_range, bin_width):
+    # 범위를 벗어난 값은 양 끝 bin으로
+    # (0.3 / 0.1 = 2.9999... 같은 부동소수점 오차 보정)
+    index = np.floor(np.round((values - value_range[0]) / bin_width, 6)).astype(np.int64)
+    return np.clip(index, 0, _n_bins(value_range, bin_width) - 1)
+
+
+def _hist_percentiles(hist, percentiles, value_range, bin_width):
+    # 마지막 축의 histogram에서 percentile에 해당하는 bin 하한값 (bin_width 해상도)
+    cumulative = np.cumsum(hist, axis=-1)
+    total = cumulative[..., -1:]
+    result = []
+    for q in percentiles:
+        target = np.maximum(np.ceil(total * q / 100), 1)
+        index = (cumulative < target).sum(axis=-1)
+        value = value_range[0] + np.minimum(index, hist.shape[-1] - 1) * bin_width
+        result.append(np.where(total[..., 0] > 0, value, np.nan))
+    return result
+
+
+def _to_number(series):
+    # report 값 ("< 1", "Unknown" 등)을 숫자로 ("< 1" -> 1, 변환 불가 -> NaN)
+    text = series.astype(str).str.replace('<', '', regex=False).str.strip()
+    return pd.to_numeric(text, errors='coerce')
+
+
+def report_metrics(report):
+    # xml_to_csv 결과(환자별 report 필드)에서 환자 단위 지표 계산
+    qrs = _to_number(report["QRScomplexes"])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics = pd.DataFrame({
+            "PID": report["PID"].astype(str).to_numpy(),
+            "V_Burden": (_to_number(report["VentricularBeats"]) / qrs * 100).to_numpy(),
+            "S_Burden": (_to_number(report["SupraventricularBeats"]) / qrs * 100).to_numpy(),
+            "AFAFLPercentage": _to_number(report["AFAFLPercentage"]).to_numpy(),
+            "NoisePercentage": _to_number(report["NoisePercentage"]).to_numpy(),
+        })
+    return metrics
+
+
+def _hourly_pid(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name[:-len("_hourly_hr")] if name.endswith("_hourly_hr") else name
+
+
+def read_hourly_table(path):
+    # holter_cli hr 결과 또는 저장한 벤더 HR 테이블 (<PID>_hourly_hr.csv / .parquet)
+    pid = _hourly_pid(path)
+    if path.endswith('.parquet'):
+        return pid, pd.read_parquet(path)
+    return pid, pd.read_csv(path)
+
+
+class CohortSketch:
+    # 코호트 분포를 고정 크기 histogram / 합계로 저장 (worker별 부분 결과를 merge로 합침)
+    # - hourly : 시간대(0~23시) x HR histogram, 시간대별 합계
+    # - report : 환자 단위 burden / noise(%) histogram
+    def __init__(self):
+        n_hr = _n_bins(HR_RANGE, HR_BIN_WIDTH)
+        n_percent = _n_bins(PERCENT_RANGE, PERCENT_BIN_WIDTH)
+        self.hr_hist = np.zeros((len(HOURLY_HR_COLUMNS), 24, n_hr), dtype=np.int64)
+        self.hour_sums = np.zeros((len(HOURLY_SUM_COLUMNS), 24), dtype=np.float64)
+        self.hour_patients = np.zeros(24, dtype=np.int64)
+        self.report_hist = np.zeros((len(REPORT_METRICS), n_percent), dtype=np.int64)
+        self.hourly_pids = set()
+        self.report_pids = set()
+
+    def add_hourly(self, tables, min_minutes=30):
+        # tables : [(pid, HR 테이블), ...] -> 쌓아서 한 번에 histogram 누적 (이미 포함된 PID는 건너뜀)
+        tables = [(pid, table) for pid, table in tables if pid not in self.hourly_pids]
+        if not tables:
+            return self
+        stacked = pd.concat([table.assign(PID=pid) for pid, table in tables], ignore_index=True)
+        hour = stacked["Hour"].to_numpy(dtype=np.int64) % 24
+
+        for i, col in enumerate(HOURLY_SUM_COLUMNS):
+            self.hour_sums[i] += np.bincount(hour, weights=np.nan_to_num(stacked[col].to_numpy(dtype=float)), minlength=24)
+        # 시간대별 기록이 있는 환자 수 (24시간 이상 기록에서 같은 시간대가 두 번 나와도 1명)
+        pid_hour = stacked[["PID"]].assign(Hour=hour).drop_duplicates()
+        self.hour_patients += np.bincount(pid_hour["Hour"].to_numpy(), minlength=24)
+
+        # 기록 시간이 min_minutes 미만인 시간대(hookup / 종료 시간대)는 HR 분포에서 제외
+        full = stacked["Min"].to_numpy(dtype=float) >= min_minutes
+        n_hr = self.hr_hist.shape[-1]
+        for i, col in enumerate(HOURLY_HR_COLUMNS):
+            values = stacked[col].to_numpy(dtype=float)
+            valid = full & ~np.isnan(values)
+            flat = hour[valid] * n_hr + _bin_index(values[valid], HR_RANGE, HR_BIN_WIDTH)
+            self.hr_hist[i] += np.bincount(flat, minlength=24 * n_hr).reshape(24, n_hr)
+
+        self.hourly_pids.update(pid for pid, _ in tables)
+        return self
+
+    def add_reports(self, report):
+        # report : xml_to_csv 결과 DataFrame (이미 포함된 PID는 건너뜀)
+        metrics = report_metrics(report)
+        metrics = metrics[~metrics["PID"].isin(self.report_pids)].drop_duplicates("PID")
+        n_percent = self.report_hist.shape[-1]
+        for i, col in enumerate(REPORT_METRICS):
+            values = metrics[col].to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            self.report_hist[i] += np.bincount(_bin_index(values, PERCENT_RANGE, PERCENT_BIN_WIDTH), minlength=n_percent)
+        self.report_pids.update(metrics["PID"])
+        return self
+
+    def merge(self, other):
+        # 서로 다른 환자 집합으로 만든 sketch 합치기
+        overlap = (self.hourly_pids & other.hourly_pids) | (self.report_pids & other.report_pids)
+        if overlap:
+            raise ValueError(f"두 sketch에 같은 PID가 포함되어 있습니다. PID : {sorted(overlap)[:10]}")
+        self.hr_hist += other.hr_hist
+        self.hour_sums += other.hour_sums
+        self.hour_patients += other.hour_patients
+        self.report_hist += other.report_hist
+        self.hourly_pids |= other.hourly_pids
+        self.report_pids |= other.report_pids
+        return self
+
+    def hourly_table(self, percentiles=(5, 25, 50, 75, 95)):
+        # 시간대별 코호트 HR 분포 + 평균 QRS 수 / Pause 수
+        table = pd.DataFrame({"Hour": np.arange(24), "Patients": self.hour_patients})
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for i, col in enumerate(HOURLY_SUM_COLUMNS):
+                table[f"{col}_mean"] = self.hour_sums[i] / self.hour_patients
+        for i, col in enumerate(HOURLY_HR_COLUMNS):
+            for q, values in zip(percentiles, _hist_percentiles(self.hr_hist[i], percentiles, HR_RANGE, HR_BIN_WIDTH)):
+                table[f"{col}_P{q:g}"] = values
+        return table
+
+    def report_table(self, percentiles=(5, 25, 50, 75, 95)):
+        # 환자 단위 burden / noise(%) 코호트 분포
+        values = _hist_percentiles(self.report_hist, percentiles, PERCENT_RANGE, PERCENT_BIN_WIDTH)
+        table = pd.DataFrame({"N": self.report_hist.sum(axis=1)}, index=pd.Index(REPORT_METRICS, name="Metric"))
+        for q, value in zip(percentiles, values):
+            table[f"P{q:g}"] = value
+        return table
+
+    def save(self, path):
+        np.savez(path, hr_hist=self.hr_hist, hour_sums=self.hour_sums, hour_patients=self.hour_patients,
+                 report_hist=self.report_hist, hourly_pids=np.array(sorted(self.hourly_pids), dtype=str),
+                 report_pids=np.array(sorted(self.report_pids), dtype=str))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        sketch = cls()
+        sketch.hr_hist = data["hr_hist"]
+        sketch.hour_sums = data["hour_sums"]
+        sketch.hour_patients = data["hour_patients"]
+        sketch.report_hist = data["report_hist"]
+        sketch.hourly_pids = set(data["hourly_pids"].tolist())
+        sketch.report_pids = set(data["report_pids"].tolist())
+        return sketch
+
+
+def _partition_sketch(args):
+    # worker : partition 하나의 HR 테이블 / report 행을 읽어 부분 sketch 생성
+    hourly_paths, report, min_minutes = args
+    sketch = CohortSketch()
+    tables = []
+    for path in hourly_paths:
+        try:
+            tables.append(read_hourly_table(path))
+        except Exception as e:
+            print(f"Failed to process {path}: {e}")
+    sketch.add_hourly(tables, min_minutes)
+    if report is not None and len(report) > 0:
+        sketch.add_reports(report)
+    return sketch
+
+
+# 코호트 sketch 생성 / 갱신
+# hourly_paths : PID별 HR 테이블 경로 목록, report : xml_to_csv 결과 (DataFrame 또는 CSV 경로)
+# sketch가 주어지면 아직 포함되지 않은 PID만 계산해서 합침 (새 환자 추가 시 기존 환자는 다시 읽지 않음)
+def build_cohort_sketch(hourly_paths=(), report=None, sketch=None, workers=None, partitions=None, min_minutes=30):
+    sketch = CohortSketch() if sketch is None else sketch
+    if isinstance(report, str):
+        report = pd.read_csv(report)
+
+    hourly_paths = [path for path in hourly_paths if _hourly_pid(path) not in sketch.hourly_pids]
+    if report is not None:
+        report = report[~report["PID"].astype(str).isin(sketch.report_pids)]
+
+    if partitions is None:
+        partitions = workers or os.cpu_count()
+    hourly_parts = np.array_split(np.asarray(hourly_paths, dtype=object), partitions)
+    report_parts = np.array_split(np.arange(len(report)), partitions) if report is not None else [None] * partitions
+    tasks = [(list(paths), None if rows is None else report.iloc[rows], min_minutes)
+             for paths, rows in zip(hourly_parts, report_parts)
+             if len(paths) > 0 or (rows is not None and len(rows) > 0)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(_partition_sketch, tasks):
+            sketch.merge(partial)
+    return sketch
+
@@ -0,0 +1,107 @@
+import os
+from datetime import datetime
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .utils import read_event_labels
+from .xml_to_csv import read_hookup_datetime
+
+EVENT_TIME_FORMAT = "%H:%M:%S %d-%b-%Y"
+
+
+# 레코드 하나의 라벨 이벤트 목록 (PID, 이벤트 시각, 라벨, 레코드 내 시작 sample)
+def plan_record_events(label_path, xml_path, sig_path, fs, label_column=None):
+    pid, event_labeling_df = read_event_labels(label_path)
+    # 다른 환자의 신호가 라벨과 섞이지 않도록 Label 파일과 xml 파일의 PID 확인 (iter_segments_from_SIG와 동일)
+    xml_pid = ET.parse(xml_path).getroot().find('PatientInfo').find('PID').text
+    if pid != xml_pid:
+        raise TypeError(f"Label 파일과 xml 파일의 PID가 일치하지 않습니다. label : {pid} / xml : {xml_pid}")
+    hookup_dt = read_hookup_datetime(xml_path)
+
+    # 라벨 컬럼을 지정하지 않으면 Date/Time 외 첫 번째 컬럼 사용
+    if label_column is None:
+        label_column = [col for col in event_labeling_df.columns if col != "Date/Time"][0]
+
+    event_time = [datetime.strptime(dt, EVENT_TIME_FORMAT) for dt in event_labeling_df["Date/Time"].astype(str)]
+    offset = [int((dt - hookup_dt).total_seconds() * fs) for dt in event_time]
+    return pd.DataFrame({
+        "PID": pid,
+        "EventTime": [dt.strftime(EVENT_TIME_FORMAT) for dt in event_time],
+        "Label": event_labeling_df[label_column].astype(str).to_numpy(),
+        "Offset": offset,
+        "SIG_file_path": sig_path,
+    })
+
+
+def _fill_record(args):
+    # 한 레코드의 이벤트 window를 memmap의 해당 행에 직접 기록 (worker마다 r+로 열어서 사용)
+    # 실패한 레코드는 로그만 남기고 해당 행은 NaN / Complete=False로 둠 (다른 레코드 처리는 계속)
+    dataset_path, sig_path, rows, offsets, window, n_channels, fs = args
+    import wfdb
+
+    complete = np.zeros(len(rows), dtype=bool)
+    try:
+        windows = np.lib.format.open_memmap(dataset_path, mode='r+')
+        header = wfdb.rdheader(sig_path)
+        if header.fs != fs or header.n_sig != n_channels:
+            print(f"샘플링 레이트 / 채널 수가 데이터셋과 다릅니다. {sig_path} : fs={header.fs}, n_sig={header.n_sig}")
+            return rows, complete
+
+        for i, (row, offset) in enumerate(zip(rows, offsets)):
+            # 레코드 범위를 벗어난 부분은 NaN으로 남김
+            start, end = max(offset, 0), min(offset + window, header.sig_len)
+            if start >= end:
+                continue
+            record = wfdb.rdrecord(sig_path, sampfrom=start, sampto=end)
+            windows[row, start - offset:end - offset] = record.p_signal
+            complete[i] = (start == offset) and (end == offset + window)
+        windows.flush()
+    except Exception as e:
+        print(f"Failed to process {sig_path}: {e}")
+    return rows, complete
+
+
+# 코호트 전체 라벨 이벤트를 고정 길이 multichannel window로 단일 .npy(memmap)에 저장
+# items : [(label_path, xml_path, sig_path), ...]
+# 결과 : <name>.npy (n_events, length*fs, n_channels) float32 + <name>_index.csv (행 번호 = window index)
+def build_event_dataset(items, output_dir, name='event_windows', length=60, fs=125, n_channels=3,
+                        label_column=None, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+
+    plans = []
+    for label_path, xml_path, sig_path in items:
+        try:
+            plans.append(plan_record_events(label_path, xml_path, sig_path, fs, label_column))
+        except Exception as e:
+            print(f"Failed to process {label_path}: {e}")
+    if not plans:
+        raise ValueError("추출할 이벤트가 없습니다.")
+    index = pd.concat(plans, ignore_index=True)
+
+    # 전체 크기를 미리 할당 (NaN으로 초기화)
+    window = int(length * fs)
+    dataset_path = os.path.join(output_dir, f"{name}.npy")
+    windows = np.lib.format.open_memmap(dataset_path, mode='w+', dtype=np.float32, shape=(len(index), window, n_channels))
+    windows[:] = np.nan
+    windows.flush()
+    del windows
+
+    tasks = [(dataset_path, sig_path, group.index.to_numpy(), group["Offset"].to_numpy(), window, n_channels, fs)
+             for sig_path, group in index.groupby("SIG_file_path", sort=False)]
+    index["Complete"] = False
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rows, complete in executor.map(_fill_record, tasks):
+            index.loc[rows, "Complete"] = complete
+
+    index.to_csv(os.path.join(output_dir, f"{name}_index.csv"), index_label="WindowIndex")
+    return dataset_path, index
+
+
+# 저장된 데이터셋 불러오기 (window 배열은 memmap이므로 index로 바로 접근)
+def load_event_dataset(output_dir, name='event_windows'):
+    windows = np.load(os.path.join(output_dir, f"{name}.npy"), mmap_mode='r')
+    index = pd.read_csv(os.path.join(output_dir, f"{name}_index.csv"), index_col="WindowIndex")
+    return windows, index
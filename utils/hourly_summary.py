@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# convert_pdf_to_dict의 'HR' 테이블과 같은 컬럼 구성
+HR_COLUMNS = ["Hour", "Min", "#QRS's", "Min.", "Ave.", "Max.", "Pauses"]
+
+
+def hour_buckets(offset_s, hookup_dt, duration):
+    # hookup 시각부터 wall-clock 정시 단위로 구간 나누기 (첫 구간은 hookup ~ 다음 정시)
+    hookup = pd.Timestamp(hookup_dt)
+    first_hour = hookup.floor('h')
+    lead = (hookup - first_hour).total_seconds()
+
+    bucket = ((offset_s + lead) // 3600).astype(np.int64)
+    # 마지막 비트가 정시에 딱 걸리거나 duration보다 늦은 비트가 있어도 모든 비트가 구간에 들어가도록
+    n_buckets = max(int(np.ceil((duration + lead) / 3600)), int(bucket.max()) + 1 if len(bucket) > 0 else 0, 1)
+
+    # 구간별 실제 기록 시간(분)
+    edges = np.arange(n_buckets + 1) * 3600 - lead
+    minutes = np.clip(np.minimum(edges[1:], duration) - np.maximum(edges[:-1], 0), 0, None) / 60
+    hours = (first_hour + pd.to_timedelta(np.arange(n_buckets), unit='h')).hour
+    return bucket, n_buckets, minutes, hours
+
+
+# Beat table로부터 Hourly Summary(HR) 테이블 계산
+# Min./Max. HR은 hr_average_beats개 비트 평균 RR 기준, Ave.는 #QRS's / 기록 시간(분)
+def compute_hourly_summary(beats, fs, hookup_dt, duration=None, pause_threshold=2.0, hr_average_beats=8):
+    r_peaks = np.asarray(beats["R_Peak"], dtype=np.int64)
+    offset_s = r_peaks / fs
+    if duration is None:
+        duration = offset_s[-1] if len(offset_s) > 0 else 0
+
+    bucket, n_buckets, minutes, hours = hour_buckets(offset_s, hookup_dt, duration)
+    qrs_count = np.bincount(bucket, minlength=n_buckets)
+
+    # Pause : 직전 비트와의 RR이 pause_threshold(초) 이상인 비트 수
+    rr = np.diff(r_peaks) / fs
+    pauses = np.bincount(bucket[1:][rr >= pause_threshold], minlength=n_buckets)
+
+    # hr_average_beats개 RR 평균 HR (누적합 차이로 계산)
+    k = hr_average_beats
+    avg_hr = 60 * k * fs / (r_peaks[k:] - r_peaks[:-k]) if len(r_peaks) > k else np.array([])
+    hr_range = pd.Series(avg_hr).groupby(bucket[k:]).agg(['min', 'max']).reindex(range(n_buckets))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = np.where(minutes > 0, qrs_count / minutes, np.nan)
+
+    summary = pd.DataFrame({
+        "Hour": hours,
+        "Min": np.round(minutes).astype(int),
+        "#QRS's": qrs_count,
+        "Min.": np.round(hr_range['min'].to_numpy()),
+        "Ave.": np.round(average),
+        "Max.": np.round(hr_range['max'].to_numpy()),
+        "Pauses": pauses,
+    })
+    return summary
+
+
+# 계산한 테이블과 벤더 테이블을 시간대 순서로 맞춘 뒤 컬럼별 차이 계산
+# 24시간 이상 기록은 같은 Hour가 두 번 나오므로 (Hour, 등장 순번)으로 join
+def compare_hourly_summary(computed, vendor, columns=None):
+    if columns is None:
+        columns = [col for col in HR_COLUMNS if col != "Hour" and col in vendor.columns]
+
+    keys = ["Hour", "_Seq"]
+    computed = computed.assign(_Seq=computed.groupby("Hour").cumcount(), _Order=np.arange(len(computed)))
+    vendor = vendor.assign(_Seq=vendor.groupby("Hour").cumcount(), _Order=np.arange(len(vendor)))
+    merged = computed[keys + ["_Order"] + columns].merge(
+        vendor[keys + ["_Order"] + columns], on=keys, how="outer", suffixes=("_computed", "_vendor"))
+
+    # 기록 순서(hookup 시각부터) 유지
+    order = merged["_Order_computed"].fillna(merged["_Order_vendor"])
+    merged = merged.iloc[np.argsort(order.to_numpy(), kind='stable')].reset_index(drop=True)
+
+    for col in columns:
+        merged[f"{col}_delta"] = merged[f"{col}_computed"].astype(float) - merged[f"{col}_vendor"].astype(float)
+    return merged.drop(columns=["_Seq", "_Order_computed", "_Order_vendor"])
+
+
+# 코호트 전체 discrepancy 데이터셋
+# records : [(pid, beat_table, fs, hookup_dt), ...], vendor_dict : convert_pdf_to_dict 결과 (pid -> {'HR': DataFrame, ...})
+def hourly_discrepancy_cohort(records, vendor_dict, **kwargs):
+    frames = []
+    for pid, beats, fs, hookup_dt in records:
+        if pid not in vendor_dict:
+            print(f"벤더 Hourly Summary가 없습니다. PID : {pid}")
+            continue
+        computed = compute_hourly_summary(beats, fs, hookup_dt, **kwargs)
+        merged = compare_hourly_summary(computed, vendor_dict[pid]['HR'])
+        merged.insert(0, "PID", pid)
+        frames.append(merged)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
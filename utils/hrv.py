@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from .beat_table import beat_columns
+from .hourly_summary import hour_buckets
+
+# 주파수 영역 band (Hz)
+FREQUENCY_BANDS = {"VLF": (0.0033, 0.04), "LF": (0.04, 0.15), "HF": (0.15, 0.4)}
+RESAMPLE_FS = 4
+
+
+# Beat table에서 NN interval(ms)과 유효 여부 계산
+# 생리적 범위를 벗어나거나 직전 대비 max_change 이상 변한 RR, 'Class'가 있으면 N-N이 아닌 RR은 artifact로 제외
+def nn_intervals(beats, fs, min_rr=300, max_rr=2000, max_change=0.2):
+    r_peaks = np.asarray(beats["R_Peak"], dtype=np.int64)
+    rr = np.diff(r_peaks) / fs * 1000
+    times = r_peaks[1:] / fs
+
+    valid = (rr >= min_rr) & (rr <= max_rr)
+    valid[1:] &= np.abs(np.diff(rr)) <= max_change * rr[:-1]
+    if "Class" in beat_columns(beats):
+        normal = np.asarray(beats["Class"]) == 'N'
+        valid &= normal[1:] & normal[:-1]
+    return times, rr, valid
+
+
+def _time_domain(rr, valid, group, n_groups):
+    # 그룹별 Mean NN, SDNN, RMSSD, pNN50을 bincount 합계로 한 번에 계산
+    g, x = group[valid], rr[valid]
+    count = np.bincount(g, minlength=n_groups)
+    total = np.bincount(g, weights=x, minlength=n_groups)
+    square = np.bincount(g, weights=x ** 2, minlength=n_groups)
+
+    # 연속 차이는 두 NN이 모두 유효하고 같은 그룹일 때만 사용
+    diff = np.diff(rr)
+    pair = valid[1:] & valid[:-1] & (group[1:] == group[:-1])
+    gp, dp = group[1:][pair], diff[pair]
+    n_pair = np.bincount(gp, minlength=n_groups)
+    diff_square = np.bincount(gp, weights=dp ** 2, minlength=n_groups)
+    over_50 = np.bincount(gp, weights=np.abs(dp) > 50, minlength=n_groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        sdnn = np.sqrt(np.clip(square - count * mean ** 2, 0, None) / (count - 1))
+        rmssd = np.sqrt(diff_square / n_pair)
+        pnn50 = over_50 / n_pair * 100
+
+    return pd.DataFrame({"N": count, "Mean_NN": mean, "SDNN": sdnn, "RMSSD": rmssd, "pNN50": pnn50})
+
+
+def _frequency_domain(times, rr, valid, window, n_windows):
+    # 전체 NN 시계열을 4Hz로 한 번 보간한 뒤 window별로 쌓아서 FFT 한 번에 PSD 계산
+    n_per_window = int(window * RESAMPLE_FS)
+    grid = np.arange(n_windows * n_per_window) / RESAMPLE_FS
+    result = pd.DataFrame(np.nan, index=range(n_windows), columns=list(FREQUENCY_BANDS) + ["LF_HF"])
+    if valid.sum() < 2:
+        return result
+
+    segments = np.interp(grid, times[valid], rr[valid]).reshape(n_windows, n_per_window)
+    segments = segments - segments.mean(axis=1, keepdims=True)
+    taper = np.hanning(n_per_window)
+    spectrum = np.fft.rfft(segments * taper, axis=1)
+    psd = 2 * np.abs(spectrum) ** 2 / (RESAMPLE_FS * np.sum(taper ** 2))
+    freqs = np.fft.rfftfreq(n_per_window, 1 / RESAMPLE_FS)
+    df = freqs[1] - freqs[0]
+
+    for band, (low, high) in FREQUENCY_BANDS.items():
+        in_band = (freqs >= low) & (freqs < high)
+        result[band] = psd[:, in_band].sum(axis=1) * df
+    result["LF_HF"] = result["LF"] / result["HF"]
+    return result
+
+
+# 5분(window) 단위 HRV : 시간 영역 + 주파수 영역
+# 유효 NN 합계가 window의 min_coverage 미만이면 주파수 영역 값은 NaN
+def hrv_windows(beats, fs, window=300, hookup_dt=None, min_coverage=0.8, **kwargs):
+    times, rr, valid = nn_intervals(beats, fs, **kwargs)
+    duration = times[-1] if len(times) > 0 else 0
+    n_windows = int(duration // window)
+    if n_windows == 0:
+        return pd.DataFrame()
+
+    keep = times < n_windows * window
+    times, rr, valid = times[keep], rr[keep], valid[keep]
+    group = (times // window).astype(np.int64)
+
+    table = _time_domain(rr, valid, group, n_windows)
+    table["Coverage"] = np.bincount(group[valid], weights=rr[valid], minlength=n_windows) / (window * 1000)
+    frequency = _frequency_domain(times, rr, valid, window, n_windows)
+    frequency[table["Coverage"].to_numpy() < min_coverage] = np.nan
+    table = pd.concat([table, frequency], axis=1)
+
+    starts = np.arange(n_windows) * window
+    if hookup_dt is not None:
+        table.index = pd.DatetimeIndex(pd.Timestamp(hookup_dt) + pd.to_timedelta(starts, unit='s'), name="Time")
+    else:
+        table.index = pd.Index(starts, name="Offset_s")
+    return table
+
+
+# 시간대(wall-clock hour)별 HRV : 시간 영역은 NN 직접 집계, SDANN / SDNN index / 주파수 영역은 5분 window 기반
+def hrv_hourly(beats, fs, hookup_dt, window=300, min_coverage=0.8, **kwargs):
+    times, rr, valid = nn_intervals(beats, fs, **kwargs)
+    duration = times[-1] if len(times) > 0 else 0
+    bucket, n_buckets, minutes, hours = hour_buckets(times, hookup_dt, duration)
+
+    table = _time_domain(rr, valid, bucket, n_buckets)
+    table.insert(0, "Hour", hours)
+    table.insert(1, "Min", np.round(minutes).astype(int))
+
+    windows = hrv_windows(beats, fs, window, min_coverage=min_coverage, **kwargs)
+    if len(windows) > 0:
+        window_bucket, _, _, _ = hour_buckets(windows.index.to_numpy(dtype=float), hookup_dt, duration)
+        grouped = windows.groupby(window_bucket)
+        table["SDANN"] = grouped["Mean_NN"].std().reindex(range(n_buckets)).to_numpy()
+        table["SDNN_index"] = grouped["SDNN"].mean().reindex(range(n_buckets)).to_numpy()
+        for band in list(FREQUENCY_BANDS) + ["LF_HF"]:
+            table[band] = grouped[band].mean().reindex(range(n_buckets)).to_numpy()
+    return table
+
+
+# 전체 레코딩 HRV 요약 (24h SDNN, SDANN, SDNN index 등 표준 Holter 지표)
+def hrv_summary(beats, fs, window=300, min_coverage=0.8, **kwargs):
+    times, rr, valid = nn_intervals(beats, fs, **kwargs)
+    overall = _time_domain(rr, valid, np.zeros(len(rr), dtype=np.int64), 1).iloc[0].to_dict()
+
+    windows = hrv_windows(beats, fs, window, min_coverage=min_coverage, **kwargs)
+    if len(windows) > 0:
+        overall["SDANN"] = windows["Mean_NN"].std()
+        overall["SDNN_index"] = windows["SDNN"].mean()
+        for band in list(FREQUENCY_BANDS) + ["LF_HF"]:
+            overall[band] = windows[band].mean()
+    return overall
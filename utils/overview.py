@@ -0,0 +1,107 @@
+import numpy as np
+
+# pyramid level (초 단위 bin 크기) : 1초, 10초, 1분, 10분
+PYRAMID_LEVELS = (1, 10, 60, 600)
+
+
+def _pyramid_path(record_path):
+    return f"{record_path}_pyramid.npz"
+
+
+def _reduce(values, factor, func):
+    # (n_bins, n_channels) -> factor개씩 묶어서 min 또는 max (마지막 불완전 bin 포함)
+    n_bins = int(np.ceil(len(values) / factor))
+    padded = np.pad(values, ((0, n_bins * factor - len(values)), (0, 0)), mode='edge')
+    return func(padded.reshape(n_bins, factor, -1), axis=1)
+
+
+# 레코드를 청크 단위로 읽어 채널별 min/max pyramid 생성 후 레코드 옆에 저장 (<record>_pyramid.npz)
+def build_overview_pyramid(record_path, levels=PYRAMID_LEVELS, chunk_seconds=600):
+    import wfdb
+
+    # 상위 level은 바로 아래 level의 bin을 묶어서 만들므로 각 level이 다음 level을 나누어 떨어져야 함
+    levels = tuple(int(level) for level in levels)
+    if levels[0] <= 0 or any(upper <= lower or upper % lower != 0 for lower, upper in zip(levels[:-1], levels[1:])):
+        raise ValueError(f"pyramid level은 증가하는 양의 정수이고 각 level이 다음 level의 약수여야 합니다. levels : {levels}")
+
+    header = wfdb.rdheader(record_path)
+    fs = header.fs
+    samples_per_bin = int(round(levels[0] * fs))
+    chunk_size = samples_per_bin * int(chunk_seconds // levels[0])
+
+    # 가장 작은 level은 원 신호에서, 나머지는 바로 아래 level에서 계산
+    base_min, base_max = [], []
+    for start in range(0, header.sig_len, chunk_size):
+        end = min(start + chunk_size, header.sig_len)
+        chunk = wfdb.rdrecord(record_path, sampfrom=start, sampto=end).p_signal.astype(np.float32)
+        base_min.append(_reduce(chunk, samples_per_bin, np.nanmin))
+        base_max.append(_reduce(chunk, samples_per_bin, np.nanmax))
+
+    arrays = {f"min_{levels[0]}": np.concatenate(base_min), f"max_{levels[0]}": np.concatenate(base_max)}
+    for lower, upper in zip(levels[:-1], levels[1:]):
+        factor = upper // lower
+        arrays[f"min_{upper}"] = _reduce(arrays[f"min_{lower}"], factor, np.min)
+        arrays[f"max_{upper}"] = _reduce(arrays[f"max_{lower}"], factor, np.max)
+
+    path = _pyramid_path(record_path)
+    np.savez(path, levels=np.asarray(levels), fs=fs, sig_len=header.sig_len, **arrays)
+    return path
+
+
+class OverviewPyramid:
+    def __init__(self, path):
+        data = np.load(path)
+        self.fs = float(data["fs"])
+        self.sig_len = int(data["sig_len"])
+        self.levels = [int(level) for level in data["levels"]]
+        self.mins = {level: data[f"min_{level}"] for level in self.levels}
+        self.maxs = {level: data[f"max_{level}"] for level in self.levels}
+
+    @classmethod
+    def load(cls, record_path):
+        return cls(_pyramid_path(record_path))
+
+    def select_level(self, start_s, end_s, n_pixels):
+        # 픽셀당 bin이 1개 이상 되는 가장 큰 level (없으면 None -> 원 신호 사용)
+        seconds_per_pixel = (end_s - start_s) / n_pixels
+        usable = [level for level in self.levels if level <= seconds_per_pixel]
+        return max(usable) if usable else None
+
+    def query(self, start_s, end_s, n_pixels, level=None):
+        # 반환 : bin 시작 시각(초), min (n_bins, n_channels), max (n_bins, n_channels), 사용한 level
+        if level is None:
+            level = self.select_level(start_s, end_s, n_pixels)
+        if level is None:
+            return None
+
+        first = max(int(start_s // level), 0)
+        last = min(int(np.ceil(end_s / level)), len(self.mins[level]))
+        times = np.arange(first, last) * level
+        return times, self.mins[level][first:last], self.maxs[level][first:last], level
+
+
+# 요청한 시간 범위 / 픽셀 폭에 맞는 overview 반환
+# pyramid level로 충분하면 pyramid를, 짧은 구간(예: 5초 strip)은 해당 구간만 원 신호에서 읽어 픽셀 단위 min/max 계산
+# 반환 형태는 두 경우 모두 같음 : level(원 신호면 None), time (n_bins,), min / max (n_bins, n_channels)
+def get_overview(record_path, start_s, end_s, n_pixels, pyramid=None):
+    if pyramid is None:
+        pyramid = OverviewPyramid.load(record_path)
+
+    result = pyramid.query(start_s, end_s, n_pixels)
+    if result is not None:
+        times, mins, maxs, level = result
+        return {"level": level, "time": times, "min": mins, "max": maxs}
+
+    import wfdb
+
+    start = max(int(start_s * pyramid.fs), 0)
+    end = min(int(np.ceil(end_s * pyramid.fs)), pyramid.sig_len)
+    segment = wfdb.rdrecord(record_path, sampfrom=start, sampto=end).p_signal
+    # 픽셀보다 sample이 적으면 sample 하나가 bin 하나 (min == max)
+    samples_per_bin = max(int(np.ceil(len(segment) / n_pixels)), 1)
+    return {
+        "level": None,
+        "time": (start + np.arange(0, len(segment), samples_per_bin)) / pyramid.fs,
+        "min": _reduce(segment, samples_per_bin, np.nanmin),
+        "max": _reduce(segment, samples_per_bin, np.nanmax),
+    }
@@ -0,0 +1,87 @@
+import numpy as np
+
+from .beat_table import beat_columns
+
+# Beat table 컬럼 -> (format, marker size, label)
+FIDUCIAL_MARKERS = {
+    "R_Peak": ('rx', 8, 'R-peaks'),
+    "Q_Onset": ('mo', 8, 'Q-onsets'),
+    "S_Peak": ('go', 8, 'S-peaks'),
+    "T_Peak": ('b^', 8, 'T-peaks'),
+    "T_Offset": ('ys', 4, 'T-offsets'),
+}
+
+
+# 픽셀 폭에 맞춰 구간별 min/max만 남기는 decimation (파형 외곽선은 그대로 유지)
+def minmax_decimate(ecg_signal, n_pixels):
+    ecg_signal = np.asarray(ecg_signal)
+    if len(ecg_signal) <= 2 * n_pixels:
+        return np.arange(len(ecg_signal)), ecg_signal
+
+    bucket = int(np.ceil(len(ecg_signal) / n_pixels))
+    n_buckets = int(np.ceil(len(ecg_signal) / bucket))
+    padded = np.pad(ecg_signal, (0, n_buckets * bucket - len(ecg_signal)), mode='edge').reshape(n_buckets, bucket)
+
+    offset = np.arange(n_buckets) * bucket
+    idx_min = offset + padded.argmin(axis=1)
+    idx_max = offset + padded.argmax(axis=1)
+    # 시간 순서대로 min/max를 교차 배치
+    index = np.sort(np.stack([idx_min, idx_max], axis=1), axis=1).ravel()
+    index = np.minimum(index, len(ecg_signal) - 1)
+    return index, ecg_signal[index]
+
+
+class AnnotationRenderer:
+    # Figure / line artist를 한 번만 만들고 채널, 레코드마다 데이터만 교체해서 저장
+    def __init__(self, figsize=(20, 5), dpi=100):
+        # matplotlib은 renderer를 만들 때만 import (minmax_decimate만 쓰는 경우 불필요)
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.n_pixels = int(figsize[0] * dpi)
+
+        self.line, = self.ax.plot([], [], color='#3366cc', linewidth=1)
+        self.markers = {}
+        for column, (fmt, markersize, label) in FIDUCIAL_MARKERS.items():
+            self.markers[column], = self.ax.plot([], [], fmt, markersize=markersize, label=label)
+
+        self.ax.set_xlabel('Time (s)', fontsize=12)
+        self.ax.set_ylabel('Amplitude (mV)', fontsize=12)
+        self.ax.legend(fontsize=10, loc='upper right')
+        # 제목 영역까지 포함해 레이아웃을 한 번만 계산 (매 저장마다 bbox_inches='tight' 계산 생략)
+        self.ax.set_title(' ', fontsize=16)
+        self.fig.tight_layout()
+
+    def render(self, ecg_signal, fs, save_path, beats=None, title='', start=0):
+        # start : ecg_signal 첫 sample의 레코딩 내 index (beat table의 sample index 기준)
+        index, values = minmax_decimate(ecg_signal, self.n_pixels)
+        self.line.set_data((index + start) / fs, values)
+
+        columns = beat_columns(beats) if beats is not None else ()
+        for column, artist in self.markers.items():
+            if column not in columns:
+                artist.set_data([], [])
+                continue
+            position = np.asarray(beats[column], dtype=np.int64) - start
+            position = position[(position >= 0) & (position < len(ecg_signal))]
+            artist.set_data((position + start) / fs, ecg_signal[position])
+
+        margin = 0.05 * (values.max() - values.min() + 1e-12)
+        self.ax.set_xlim(start / fs, (start + len(ecg_signal)) / fs)
+        self.ax.set_ylim(values.min() - margin, values.max() + margin)
+        self.ax.set_title(title, fontsize=16)
+        self.fig.savefig(save_path)
+        return save_path
+
+
+# 프로세스당 하나의 renderer를 재사용 (process pool worker용)
+_renderers = {}
+
+def get_renderer(figsize=(20, 5), dpi=100):
+    key = (tuple(figsize), dpi)
+    if key not in _renderers:
+        _renderers[key] = AnnotationRenderer(figsize, dpi)
+    return _renderers[key]
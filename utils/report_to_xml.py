@@ -1,9 +1,7 @@
 import os
 import re
-import fitz  # PyMuPDF
 from xml.etree.ElementTree import Element, SubElement, tostring
 from xml.dom.minidom import parseString
-from tqdm import tqdm
 
 def extract_match(pattern, text, default="Unknown"):
     match = re.search(pattern, text)
@@ -100,7 +98,58 @@ def create_xml(patient_info, general_data, heart_rates_data, ventriculars_data,
     with open(xml_path, "w") as xml_file:
         xml_file.write(pretty_xml_str)
 
+def process_pdf_file(pdf_path, xml_dir):
+    import fitz  # PyMuPDF (import 비용이 커서 사용 시점에 import)
+
+    filename = os.path.basename(pdf_path)
+    pdf_doc = fitz.open(pdf_path)
+    page = pdf_doc.load_page(0)
+    extracted_text = page.get_text()
+
+    patient_info = {
+        'PID': extract_match(r"Patient Name:?\n(\d+)\nID:?", extracted_text, filename.split('_')[-1].replace('.pdf', '')),
+        'HookupDate': extract_match(r"Medications:?\n(\d+-\w+-\d+)\nHookup Date:?", extracted_text, "Unknown"),
+        'HookupTime': extract_match(r"Hookup Date:?\n(\d+:\d+:\d+)\nHookup Time:?", extracted_text, "Unknown"),
+        'Duration': extract_match(r"Hookup Time:?\n(\d+:\d+:\d+)\nDuration:?", extracted_text, "Unknown"),
+        'Age': extract_match(r"(\d+)\s*yr\s*Age:", extracted_text, "Unknown"),
+        'Gender': extract_match(r"(Male|Female)\s*Gender:", extracted_text, "Unknown")
+    }
+
+    general_data = parse_general_section(extracted_text)
+
+    heart_rates_data = parse_heart_rates_section(extracted_text)
+
+    ventriculars_section = extract_match(r"Ventriculars \(V, F, E, I\)\n([\s\S]+?)\nSupraventriculars \(S, J, A\)", extracted_text, "")
+    supraventriculars_section = extract_match(r"Supraventriculars \(S, J, A\)\n([\s\S]+?)Interpretation", extracted_text, "")
+
+    ventriculars_patterns = [
+        (r"(\d+) Isolated", ['Isolated']),
+        (r"(\d+) Couplets", ['Couplets']),
+        (r"(\d+) Bigeminal cycles", ['BigeminalCycles']),
+        (r"(\d+) Runs totaling (\d+) beats", ['Runs', 'TotalBeats']),
+        (r"(\d+) Beats longest run (\d+) bpm ([\d:]+ \d+-\w+)", ['LongestRunBeats', 'LongestRunBPM', 'LongestRunTimestamp']),
+        (r"(\d+) Beats fastest run (\d+) bpm ([\d:]+ \d+-\w+)", ['FastestRunBeats', 'FastestRunBPM', 'FastestRunTimestamp'])
+    ]
+
+    supraventriculars_patterns = [
+        (r"(\d+) Isolated", ['Isolated']),
+        (r"(\d+) Couplets", ['Couplets']),
+        (r"(\d+) Bigeminal cycles", ['BigeminalCycles']),
+        (r"(\d+) Runs totaling (\d+) beats", ['Runs', 'TotalBeats']),
+        (r"(\d+) Beats longest run (\d+) bpm ([\d:]+ \d+-\w+)", ['LongestRunBeats', 'LongestRunBPM', 'LongestRunTimestamp']),
+        (r"(\d+) Beats fastest run (\d+) bpm ([\d:]+ \d+-\w+)", ['FastestRunBeats', 'FastestRunBPM', 'FastestRunTimestamp'])
+    ]
+
+    ventriculars_data = parse_section(ventriculars_section, ventriculars_patterns)
+    supraventriculars_data = parse_section(supraventriculars_section, supraventriculars_patterns)
+
+    xml_path = os.path.join(xml_dir, os.path.splitext(filename)[0] + '.xml')
+    create_xml(patient_info, general_data, heart_rates_data, ventriculars_data, supraventriculars_data, xml_path)
+    return xml_path
+
 def process_pdf_files(file_dirs, xml_dir):
+    from tqdm import tqdm
+
     pdf_files = []
     for file_dir in file_dirs:
         for root, _, files in os.walk(file_dir):
@@ -111,52 +160,9 @@ def process_pdf_files(file_dirs, xml_dir):
     failed_files = []
 
     for pdf_path in tqdm(pdf_files, desc="Processing PDF Files"):
+        filename = os.path.basename(pdf_path)
         try:
-            filename = os.path.basename(pdf_path)
-            pdf_doc = fitz.open(pdf_path)
-            page = pdf_doc.load_page(0)
-            extracted_text = page.get_text()
-
-            patient_info = {
-                'PID': extract_match(r"Patient Name:?\n(\d+)\nID:?", extracted_text, filename.split('_')[-1].replace('.pdf', '')),
-                'HookupDate': extract_match(r"Medications:?\n(\d+-\w+-\d+)\nHookup Date:?", extracted_text, "Unknown"),
-                'HookupTime': extract_match(r"Hookup Date:?\n(\d+:\d+:\d+)\nHookup Time:?", extracted_text, "Unknown"),
-                'Duration': extract_match(r"Hookup Time:?\n(\d+:\d+:\d+)\nDuration:?", extracted_text, "Unknown"),
-                'Age': extract_match(r"(\d+)\s*yr\s*Age:", extracted_text, "Unknown"),
-                'Gender': extract_match(r"(Male|Female)\s*Gender:", extracted_text, "Unknown")
-            }
-
-            general_data = parse_general_section(extracted_text)
-
-            heart_rates_data = parse_heart_rates_section(extracted_text)
-
-            ventriculars_section = extract_match(r"Ventriculars \(V, F, E, I\)\n([\s\S]+?)\nSupraventriculars \(S, J, A\)", extracted_text, "")
-            supraventriculars_section = extract_match(r"Supraventriculars \(S, J, A\)\n([\s\S]+?)Interpretation", extracted_text, "")
-
-            ventriculars_patterns = [
-                (r"(\d+) Isolated", ['Isolated']),
-                (r"(\d+) Couplets", ['Couplets']),
-                (r"(\d+) Bigeminal cycles", ['BigeminalCycles']),
-                (r"(\d+) Runs totaling (\d+) beats", ['Runs', 'TotalBeats']),
-                (r"(\d+) Beats longest run (\d+) bpm ([\d:]+ \d+-\w+)", ['LongestRunBeats', 'LongestRunBPM', 'LongestRunTimestamp']),
-                (r"(\d+) Beats fastest run (\d+) bpm ([\d:]+ \d+-\w+)", ['FastestRunBeats', 'FastestRunBPM', 'FastestRunTimestamp'])
-            ]
-
-            supraventriculars_patterns = [
-                (r"(\d+) Isolated", ['Isolated']),
-                (r"(\d+) Couplets", ['Couplets']),
-                (r"(\d+) Bigeminal cycles", ['BigeminalCycles']),
-                (r"(\d+) Runs totaling (\d+) beats", ['Runs', 'TotalBeats']),
-                (r"(\d+) Beats longest run (\d+) bpm ([\d:]+ \d+-\w+)", ['LongestRunBeats', 'LongestRunBPM', 'LongestRunTimestamp']),
-                (r"(\d+) Beats fastest run (\d+) bpm ([\d:]+ \d+-\w+)", ['FastestRunBeats', 'FastestRunBPM', 'FastestRunTimestamp'])
-            ]
-
-            ventriculars_data = parse_section(ventriculars_section, ventriculars_patterns)
-            supraventriculars_data = parse_section(supraventriculars_section, supraventriculars_patterns)
-
-            xml_path = os.path.join(xml_dir, os.path.splitext(filename)[0] + '.xml')
-            create_xml(patient_info, general_data, heart_rates_data, ventriculars_data, supraventriculars_data, xml_path)
-
+            xml_path = process_pdf_file(pdf_path, xml_dir)
             print(f"Processed {filename}, Saved XML file: {xml_path}")
 
         except Exception as e:
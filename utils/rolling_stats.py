@@ -0,0 +1,129 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+def _window_bounds(beat_times, window, step, duration):
+    # 각 window [start, start+window)에 속하는 비트 index 범위 (lo, hi)
+    n_windows = int(np.floor((duration - window) / step)) + 1
+    starts = np.arange(max(n_windows, 0)) * step
+    lo = np.searchsorted(beat_times, starts, side='left')
+    hi = np.searchsorted(beat_times, starts + window, side='left')
+    return starts, lo, hi
+
+
+def _sliding_extrema(values, lo, hi):
+    # monotonic deque로 window별 min/max 계산
+    # 각 비트는 deque에 한 번 들어가고 한 번 나오므로 window당 O(1) amortized
+    win_min = np.full(len(lo), np.nan)
+    win_max = np.full(len(lo), np.nan)
+    values = values.tolist()
+    min_dq, max_dq = deque(), deque()
+
+    right = 0
+    for k in range(len(lo)):
+        while right < hi[k]:
+            v = values[right]
+            if v == v:  # NaN 제외
+                while min_dq and values[min_dq[-1]] >= v:
+                    min_dq.pop()
+                min_dq.append(right)
+                while max_dq and values[max_dq[-1]] <= v:
+                    max_dq.pop()
+                max_dq.append(right)
+            right += 1
+
+        while min_dq and min_dq[0] < lo[k]:
+            min_dq.popleft()
+        while max_dq and max_dq[0] < lo[k]:
+            max_dq.popleft()
+
+        if min_dq:
+            win_min[k] = values[min_dq[0]]
+            win_max[k] = values[max_dq[0]]
+
+    return win_min, win_max
+
+
+def _sliding_percentiles(values, lo, hi, percentiles, bin_width, value_range):
+    # 고정 bin 히스토그램을 window 이동에 따라 증감시켜 percentile 계산
+    # 들어오고 나가는 비트만 갱신하므로 비트 수와 무관하게 window당 O(bin 수)
+    out = np.full((len(lo), len(percentiles)), np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return out
+
+    if value_range is None:
+        value_range = (np.nanmin(values), np.nanmax(values))
+    v_min, v_max = value_range
+    n_bins = int((v_max - v_min) // bin_width) + 1
+
+    bins = np.zeros(len(values), dtype=np.int64)
+    bins[valid] = np.clip((values[valid] - v_min) // bin_width, 0, n_bins - 1)
+    bins = bins[valid]
+    # 유효 값 기준 누적 index로 lo/hi 변환
+    valid_cumsum = np.concatenate([[0], np.cumsum(valid)])
+    lo, hi = valid_cumsum[lo], valid_cumsum[hi]
+
+    hist = np.zeros(n_bins, dtype=np.int64)
+    q = np.asarray(percentiles, dtype=float) / 100
+    left = right = 0
+    for k in range(len(lo)):
+        if hi[k] > right:
+            np.add.at(hist, bins[right:hi[k]], 1)
+            right = hi[k]
+        if lo[k] > left:
+            np.subtract.at(hist, bins[left:lo[k]], 1)
+            left = lo[k]
+
+        total = hi[k] - lo[k]
+        if total == 0:
+            continue
+        ranks = np.maximum(np.ceil(q * total), 1)
+        idx = np.searchsorted(np.cumsum(hist), ranks)
+        out[k] = v_min + (idx + 0.5) * bin_width
+
+    return out
+
+
+# Beat table의 한 컬럼(QTc, HR 등)에 대한 sliding window 통계
+def rolling_beat_stats(beats, column, fs, window=30, step=5, percentiles=(5, 50, 95),
+                       hookup_dt=None, duration=None, bin_width=1.0, value_range=None):
+    beat_times = np.asarray(beats["R_Peak"], dtype=np.int64) / fs
+    values = np.asarray(beats[column], dtype=float)
+    if duration is None:
+        duration = beat_times[-1] if len(beat_times) > 0 else 0
+
+    starts, lo, hi = _window_bounds(beat_times, window, step, duration)
+
+    # 누적합으로 window별 개수/평균 계산
+    valid = ~np.isnan(values)
+    cum_count = np.concatenate([[0], np.cumsum(valid)])
+    cum_sum = np.concatenate([[0], np.cumsum(np.where(valid, values, 0))])
+    count = cum_count[hi] - cum_count[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, (cum_sum[hi] - cum_sum[lo]) / count, np.nan)
+
+    win_min, win_max = _sliding_extrema(values, lo, hi)
+    win_pct = _sliding_percentiles(values, lo, hi, percentiles, bin_width, value_range)
+
+    stats = pd.DataFrame({"Count": count, "Mean": mean, "Min": win_min, "Max": win_max})
+    for i, p in enumerate(percentiles):
+        stats[f"P{p:g}"] = win_pct[:, i]
+
+    # hookup 시각이 주어지면 wall-clock 기준 index
+    if hookup_dt is not None:
+        stats.index = pd.DatetimeIndex(pd.Timestamp(hookup_dt) + pd.to_timedelta(starts, unit='s'), name="Time")
+    else:
+        stats.index = pd.Index(starts, name="Offset_s")
+    return stats
+
+
+# QTc / HR 추이를 한 번에 계산 (컬럼명 예: QTc_Mean, HR_P95)
+def rolling_qtc_hr(beats, fs, window=30, step=5, hookup_dt=None, **kwargs):
+    frames = []
+    for column in ["QTc", "HR"]:
+        stats = rolling_beat_stats(beats, column, fs, window=window, step=step, hookup_dt=hookup_dt, **kwargs)
+        frames.append(stats.add_prefix(f"{column}_"))
+    return pd.concat(frames, axis=1)
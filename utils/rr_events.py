@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from .beat_table import beat_columns
+from .hourly_summary import hour_buckets
+
+# convert_pdf_to_dict의 'VT' / 'SVT' 테이블과 같은 컬럼 구성
+ECTOPY_COLUMNS = ["Hour", "Min", "Iso", "Cplt", "Runs", "Max_Run", "Max_Rate"]
+
+
+# boolean mask의 run-length encoding : 연속된 True 구간의 시작 index와 길이
+def find_runs(mask):
+    padded = np.concatenate([[False], np.asarray(mask, dtype=bool), [False]])
+    change = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = change[::2], change[1::2]
+    return starts, ends - starts
+
+
+# 직전 reference_beats개 RR 중앙값보다 prematurity 비율 이상 짧은 RR로 끝나는 비트를 조기 박동으로 판단
+# (평균을 쓰면 pause나 조기 박동 / 보상성 휴지기 하나가 기준 RR을 왜곡하므로 중앙값 사용)
+def premature_mask(r_peaks, prematurity=0.8, reference_beats=8):
+    rr = np.diff(r_peaks).astype(float)
+    mask = np.zeros(len(r_peaks), dtype=bool)
+    k = reference_beats
+    if len(rr) <= k:
+        return mask
+
+    windows = np.lib.stride_tricks.sliding_window_view(rr, k)[:-1]
+    reference = np.median(windows, axis=1)   # rr[i] 직전 k개 중앙값 (i >= k)
+    mask[k + 1:] = rr[k:] < prematurity * reference
+    return mask
+
+
+def _ectopy_table(mask, bucket, n_buckets, minutes, hours, r_peaks, fs):
+    # run 길이 1 = Isolated, 2 = Couplet, 3 이상 = Run (run은 첫 비트의 시간대에 집계)
+    starts, lengths = find_runs(mask)
+    run_hour = bucket[starts]
+    is_run = lengths >= 3
+
+    table = pd.DataFrame({
+        "Hour": hours,
+        "Min": np.round(minutes).astype(int),
+        "Iso": np.bincount(run_hour[lengths == 1], minlength=n_buckets),
+        "Cplt": np.bincount(run_hour[lengths == 2], minlength=n_buckets),
+        "Runs": np.bincount(run_hour[is_run], minlength=n_buckets),
+    })
+
+    # run 속도 : run 구간 평균 RR 기준 bpm (run 첫 비트 직전 RR 포함)
+    run_starts, run_lengths = starts[is_run], lengths[is_run]
+    prev = np.clip(run_starts - 1, 0, None)
+    last = run_starts + run_lengths - 1
+    rate = 60 * fs * (last - prev) / (r_peaks[last] - r_peaks[prev])
+
+    runs = pd.DataFrame({"bucket": run_hour[is_run], "length": run_lengths, "rate": rate})
+    longest = runs.groupby("bucket").agg(Max_Run=("length", "max"), Max_Rate=("rate", "max")).reindex(range(n_buckets))
+    table["Max_Run"] = longest["Max_Run"].to_numpy()
+    table["Max_Rate"] = np.round(longest["Max_Rate"].to_numpy())
+    return table
+
+
+# RR 시계열 기반 이벤트(Pause, 서맥/빈맥 에피소드, 조기 박동 run)를 시간대별로 집계
+# beat table에 'Class' 컬럼('N', 'S', 'V' ...)이 있으면 그 분류를 사용하고,
+# 없으면 RR만으로는 V/S 구분이 불가하므로 조기 박동을 모두 'SVT' 테이블에 집계
+def detect_rr_events(beats, fs, hookup_dt, duration=None, pause_threshold=2.0,
+                     brady_threshold=50, tachy_threshold=100, episode_beats=4,
+                     prematurity=0.8, reference_beats=8):
+    r_peaks = np.asarray(beats["R_Peak"], dtype=np.int64)
+    offset_s = r_peaks / fs
+    if duration is None:
+        duration = offset_s[-1] if len(offset_s) > 0 else 0
+    bucket, n_buckets, minutes, hours = hour_buckets(offset_s, hookup_dt, duration)
+
+    rr = np.diff(r_peaks) / fs
+    hr = np.concatenate([[np.nan], 60 / rr])
+
+    # Pause
+    pause = np.concatenate([[False], rr >= pause_threshold])
+
+    # 서맥 / 빈맥 : HR 조건이 episode_beats개 이상 연속되는 구간
+    hr_table = pd.DataFrame({
+        "Hour": hours,
+        "Min": np.round(minutes).astype(int),
+        "Pauses": np.bincount(bucket[pause], minlength=n_buckets),
+    })
+    for name, mask in [("Brady", hr <= brady_threshold), ("Tachy", hr >= tachy_threshold)]:
+        starts, lengths = find_runs(mask)
+        episode = lengths >= episode_beats
+        hr_table[f"{name}_Beats"] = np.bincount(bucket[mask], minlength=n_buckets)
+        hr_table[f"{name}_Episodes"] = np.bincount(bucket[starts[episode]], minlength=n_buckets)
+
+    # 조기 박동 run
+    if "Class" in beat_columns(beats):
+        beat_class = np.asarray(beats["Class"])
+        v_mask, s_mask = beat_class == 'V', beat_class == 'S'
+    else:
+        v_mask = np.zeros(len(r_peaks), dtype=bool)
+        s_mask = premature_mask(r_peaks, prematurity, reference_beats)
+
+    return {
+        'HR': hr_table,
+        'VT': _ectopy_table(v_mask, bucket, n_buckets, minutes, hours, r_peaks, fs),
+        'SVT': _ectopy_table(s_mask, bucket, n_buckets, minutes, hours, r_peaks, fs),
+    }
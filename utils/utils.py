@@ -1,14 +1,12 @@
 from glob import glob
 import pandas as pd
 import numpy as np
-import tabula   # tabula 사용 시 JAVA JDK 설치 필수
-import PyPDF2
-from datetime import datetime, timedelta
+from datetime import datetime
 import pickle
-from tqdm import tqdm
-import matplotlib.pyplot as plt
 import xml.etree.ElementTree as ET
 
+# tabula, PyPDF2, matplotlib, tqdm은 import 비용이 커서 사용하는 함수 안에서 import
+
 
 # Dict 데이터 Pickle 저장
 def save_pickle(data, path):
@@ -24,132 +22,179 @@ def load_pickle(path):
     
 
 
+HOURLY_SUMMARY_COLUMNS = [
+    "Hour", "Min", "#QRS's", "Min.", 
+    "Ave.", "Max.", "Pauses", "V_Iso", "V_Cplt", "V_Runs", "V_Max_Run", "V_Max_Rate", 
+    "S_Iso", "S_Cplt", "S_Runs", "S_Max_Run", "S_Max_Rate"
+    ] 
+
+
+# PDF 1개의 Hourly Summary 테이블을 (pid, {'HR', 'VT', 'SVT'}) 형태로 변환 (테이블이 없으면 None)
+def read_hourly_summary(path):
+    import tabula   # tabula 사용 시 JAVA JDK 설치 필수
+
+    for page in range(1,5):
+        
+        try:
+            _pdf = tabula.read_pdf(path, pages=page)
+            if len(_pdf) > 0:
+                _pdf = _pdf[0].astype(str)
+                if not _pdf.isin(["Hourly Summary"]).any().any():
+                    continue
+            else:
+                continue
+        except IndexError:
+            break
+        
+        pid = _pdf.columns[0].replace(" ", "").split(":")[1]
+        hourly_summary_df = _pdf.iloc[6:-1]
+
+        # 완전한 Hourly Summary Dataframe으로 변형
+        new_df = pd.DataFrame()
+        for col in hourly_summary_df.columns:
+            new_df = pd.concat([new_df, hourly_summary_df[col].str.split(" ", expand=True)], axis=1)
+        
+        # TODO : 결측값 처리 0 or NaN
+        new_df.replace('---', np.nan, inplace=True)
+        new_df.reset_index(drop=True, inplace=True) 
+        new_df.columns = HOURLY_SUMMARY_COLUMNS
+        
+        # NaN 값을 제외한 모든 값을 정수형으로 변환하는 함수 정의
+        def convert_to_int(value):
+            if pd.isna(value): return value
+            else: return int(value)
+        new_df = new_df.map(convert_to_int)
+        
+        # 제대로 변형 되었는지 검증 (HR #QRS's 비교)
+        _sum_str = ' '.join(_pdf.iloc[-1].astype(str))
+        _sum_list = [int(value) for value in _sum_str.split()]
+        df_sum = new_df["#QRS's"].sum()
+        if _sum_list[1] != df_sum:
+            raise Exception(f"Dataframe이 정상적으로 변형되지 않았습니다. 데이터를 확인하세요. PID : {pid} raw_sum : {_sum_list[0]} / df_sum : {df_sum}")
+
+        # Hourly Summary Dict로 변형
+        _dict = {'HR':pd.DataFrame(), 'VT':pd.DataFrame(), 'SVT':pd.DataFrame()}
+        _dict['HR'] = pd.concat([new_df.loc[:, "Hour":"Min"], new_df.loc[:, "#QRS's":"Pauses"]], axis=1)
+        _dict['VT'] = pd.concat([new_df.loc[:, "Hour":"Min"],new_df.loc[:, "V_Iso":"V_Max_Rate"]], axis=1)
+        _dict['VT'].columns = ["Hour", "Min", "Iso", "Cplt", "Runs", "Max_Run", "Max_Rate"]
+        _dict['SVT'] = pd.concat([new_df.loc[:, "Hour":"Min"], new_df.loc[:, "S_Iso":"S_Max_Rate"]], axis=1)
+        _dict['SVT'].columns = ["Hour", "Min", "Iso", "Cplt", "Runs", "Max_Run", "Max_Rate"]
+        
+        return pid, _dict
+    
+    return None
+
+
+# 여러 PDF를 하나씩 변환해서 바로 돌려주는 batch API (전체 결과를 메모리에 모으지 않음)
+def iter_hourly_summaries(paths):
+    for path in paths:
+        result = read_hourly_summary(path)
+        if result is not None:
+            yield result
+
+
 # PDF 파일 불러와서 DataFrame 형태로 변환
 def convert_pdf_to_dict(paths, output_path):
+    from tqdm import tqdm
+
     if not isinstance(paths, list):
             raise TypeError("파일 경로는 리스트 타입이어야 합니다.")
     
     print(f"PDF 파일 {len(paths)}개 변환 시작")
-        
-    columns = [
-        "Hour", "Min", "#QRS's", "Min.", 
-        "Ave.", "Max.", "Pauses", "V_Iso", "V_Cplt", "V_Runs", "V_Max_Run", "V_Max_Rate", 
-        "S_Iso", "S_Cplt", "S_Runs", "S_Max_Run", "S_Max_Rate"
-        ] 
-    
-    total_dict = {}
-    for path in tqdm(paths):
-        for page in range(1,5):
-            
-            try:
-                _pdf = tabula.read_pdf(path, pages=page)
-                if len(_pdf) > 0:
-                    _pdf = _pdf[0].astype(str)
-                    if not _pdf.isin(["Hourly Summary"]).any().any():
-                        continue
-                else:
-                    continue
-            except IndexError:
-                break
-            
-            pid = _pdf.columns[0].replace(" ", "").split(":")[1]
-            hourly_summary_df = _pdf.iloc[6:-1]
-
-            # 완전한 Hourly Summary Dataframe으로 변형
-            new_df = pd.DataFrame()
-            for col in hourly_summary_df.columns:
-                new_df = pd.concat([new_df, hourly_summary_df[col].str.split(" ", expand=True)], axis=1)
-            
-            # TODO : 결측값 처리 0 or NaN
-            new_df.replace('---', np.nan, inplace=True)
-            new_df.reset_index(drop=True, inplace=True) 
-            new_df.columns = columns
-            
-            # NaN 값을 제외한 모든 값을 정수형으로 변환하는 함수 정의
-            def convert_to_int(value):
-                if pd.isna(value): return value
-                else: return int(value)
-            new_df = new_df.map(convert_to_int)
-            
-            # 제대로 변형 되었는지 검증 (HR #QRS's 비교)
-            _sum_str = ' '.join(_pdf.iloc[-1].astype(str))
-            _sum_list = [int(value) for value in _sum_str.split()]
-            df_sum = new_df["#QRS's"].sum()
-            if _sum_list[1] != df_sum:
-                raise Exception(f"Dataframe이 정상적으로 변형되지 않았습니다. 데이터를 확인하세요. PID : {pid} raw_sum : {_sum_list[0]} / df_sum : {df_sum}")
-
-            # Hourly Summary Dict로 변형
-            _dict = {'HR':pd.DataFrame(), 'VT':pd.DataFrame(), 'SVT':pd.DataFrame()}
-            _dict['HR'] = pd.concat([new_df.loc[:, "Hour":"Min"], new_df.loc[:, "#QRS's":"Pauses"]], axis=1)
-            _dict['VT'] = pd.concat([new_df.loc[:, "Hour":"Min"],new_df.loc[:, "V_Iso":"V_Max_Rate"]], axis=1)
-            _dict['VT'].columns = ["Hour", "Min", "Iso", "Cplt", "Runs", "Max_Run", "Max_Rate"]
-            _dict['SVT'] = pd.concat([new_df.loc[:, "Hour":"Min"], new_df.loc[:, "S_Iso":"S_Max_Rate"]], axis=1)
-            _dict['SVT'].columns = ["Hour", "Min", "Iso", "Cplt", "Runs", "Max_Run", "Max_Rate"]
-            
-            total_dict[pid] = _dict
-            
-            break
     
+    total_dict = dict(iter_hourly_summaries(tqdm(paths)))
     
     print(f"{len(total_dict)}개의 Hourly Summary 테이블을 저장했습니다.")
     save_pickle(total_dict, f"{output_path}/hourly_summary.pickle")
     return total_dict
 
 
-def plot_from_SIG(pid, signal_segment, target_dt, length=60):
-    time_axis = [target_dt + timedelta(milliseconds=x) for x in np.linspace(0, 60000, num=(length*125))]
+def plot_from_SIG(pid, signal_segment, target_dt, length=60, fs=125):
+    import matplotlib.pyplot as plt
+
+    # datetime 리스트 대신 target_dt 기준 경과 시간(초)을 숫자 축으로 사용, 앞에서부터 length초만 표시
+    signal_segment = signal_segment[:int(length * fs)]
+    time_axis = np.arange(len(signal_segment)) / fs
     num_channels = signal_segment.shape[1]
     
     fig, axs = plt.subplots(num_channels, 1, figsize=(10, 8), sharex=True)
-    fig.suptitle(f"PID : {pid}")
+    fig.suptitle(f"PID : {pid} ({target_dt})")
     for i in range(num_channels):
         axs[i].plot(time_axis, signal_segment[:, i])
         axs[i].set_title(f'Channel {i+1}')
         axs[i].set_ylabel('Amplitude')
         axs[i].grid()
     
-    plt.xlabel('Time (s)')
+    plt.xlim(0, length)
+    plt.xlabel(f'Time from {target_dt} (s)')
     plt.show()
-    
-def get_segments_from_SIG(label_path, xml_path, sig_path, length=60):
-    
+
+
+# Label PDF에서 PID와 이벤트 라벨 테이블 추출
+def read_event_labels(label_path):
+    import tabula
+    import PyPDF2
+
     # PID 추출
     reader = PyPDF2.PdfReader(label_path)
     page = reader.pages[0]
     text_list = page.extract_text(0).split("\n")
-    pid_ = text_list[1].split(": ")[1]
+    pid = text_list[1].split(": ")[1]
 
     # Dataframe 추출
     event_labeling_df = tabula.read_pdf(label_path, pages='all', area=(100,40,750,600))[0]
-    # event_labeling_df["Date/Time"] = pd.to_datetime(event_labeling_df["Date/Time"])
-    
+    return pid, event_labeling_df
+
+
+# 레코드 하나의 라벨 이벤트 구간을 (pid, target_dt, segment)로 하나씩 반환
+# 레코드 전체를 읽지 않고 이벤트 구간만 sampfrom / sampto로 읽음
+def iter_segments_from_SIG(label_path, xml_path, sig_path, length=60):
+    import wfdb
+    from .xml_to_csv import read_hookup_datetime
+
+    pid_, event_labeling_df = read_event_labels(label_path)
+
     # PID, Hookup DateTime 추출
-    root = ET.parse(xml_path).getroot()
-    items = root.findall('PatientInfo')      # XML 파일 불러오기
-    for item in items:
-        pid = item.find('PID').text
-        HookupDate = item.find('HookupDate').text
-        HookupTime = item.find('HookupTime').text
-    hookup_dt = datetime.strptime(f"{HookupTime} {HookupDate}", "%H:%M:%S %d-%b-%Y")
+    pid = ET.parse(xml_path).getroot().find('PatientInfo').find('PID').text
+    hookup_dt = read_hookup_datetime(xml_path)
     
     if pid != pid_:
         raise TypeError("Label 파일과 xml 파일의 PID가 일치하지 않습니다.")
 
-    record = wfdb.rdrecord(sig_path)
+    header = wfdb.rdheader(sig_path)
+    fs = header.fs
     
     fmt = "%H:%M:%S %d-%b-%Y"
-    target_dt_list = event_labeling_df["Date/Time"].astype(str)
-    signal_segment = {}
-    for target_dt in tqdm(target_dt_list):
+    for target_dt in event_labeling_df["Date/Time"].astype(str):
         target_dt = datetime.strptime(target_dt, fmt)
         start_time = (target_dt - hookup_dt).total_seconds()
 
-        signal = record.p_signal
-        start_index = int(start_time * 125)         # 125HZ
-        end_index = int((start_time+length) * 125)
+        start_index = max(int(start_time * fs), 0)
+        end_index = min(int((start_time+length) * fs), header.sig_len)
+        if start_index >= end_index:
+            print(f"레코드 범위를 벗어난 이벤트입니다. PID : {pid} / {target_dt.strftime(fmt)}")
+            continue
+
+        record = wfdb.rdrecord(sig_path, sampfrom=start_index, sampto=end_index)
+        yield pid, target_dt.strftime(fmt), record.p_signal
+
 
-        index_dt = target_dt.strftime(fmt)
-        signal_segment[index_dt] = signal[start_index:end_index]
+# 여러 레코드 batch API : [(label_path, xml_path, sig_path), ...] -> (pid, target_dt, segment) iterator
+def iter_segments_batch(items, length=60):
+    for label_path, xml_path, sig_path in items:
+        try:
+            yield from iter_segments_from_SIG(label_path, xml_path, sig_path, length)
+        except Exception as e:
+            print(f"Failed to process {sig_path}: {e}")
+
+
+def get_segments_from_SIG(label_path, xml_path, sig_path, length=60):
+    from tqdm import tqdm
+
+    pid = None
+    signal_segment = {}
+    for pid, index_dt, segment in tqdm(iter_segments_from_SIG(label_path, xml_path, sig_path, length)):
+        signal_segment[index_dt] = segment
     
     return pid, signal_segment
 
@@ -0,0 +1,111 @@
+import base64
+import json
+import os
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+import wfdb
+
+DEFAULT_CHUNK_SIZE = 125 * 60 * 10
+
+# WFDB 저장 형식 -> base64 payload 정수 형식 (16bit 이하는 int16, 24/32bit는 int32)
+PAYLOAD_DTYPES = {
+    '8': '<i2', '16': '<i2', '61': '<i2', '80': '<i2', '160': '<i2', '212': '<i2', '310': '<i2', '311': '<i2',
+    '508': '<i2', '516': '<i2', '24': '<i4', '32': '<i4', '524': '<i4',
+}
+
+
+def _payload_dtype(header, channel):
+    fmt = str(header.fmt[channel])
+    if fmt not in PAYLOAD_DTYPES:
+        raise ValueError(f"지원하지 않는 WFDB 저장 형식입니다. channel : {channel}, fmt : {fmt}")
+    return np.dtype(PAYLOAD_DTYPES[fmt])
+
+
+def _iter_channel_chunks(record_path, header, channel, chunk_size, dtype):
+    # 채널 하나를 chunk_size sample씩 digital 값으로 읽기 (전체 레코드를 한 번에 올리지 않음)
+    for start in range(0, header.sig_len, chunk_size):
+        end = min(start + chunk_size, header.sig_len)
+        record = wfdb.rdrecord(record_path, sampfrom=start, sampto=end, channels=[channel], physical=False)
+        yield record.d_signal[:, 0].astype(dtype)
+
+
+def _write_channel_data(fw, record_path, header, channel, encoding, chunk_size):
+    gain, baseline = header.adc_gain[channel], header.baseline[channel]
+    chunks = _iter_channel_chunks(record_path, header, channel, chunk_size, _payload_dtype(header, channel))
+    if encoding == 'base64':
+        # 이어 붙여도 하나의 base64 문자열이 되도록 3 bytes 배수만 인코딩하고 나머지는 다음 청크로 넘김
+        pending = b''
+        for chunk in chunks:
+            data = pending + chunk.tobytes()
+            cut = len(data) // 3 * 3
+            fw.write(base64.b64encode(data[:cut]).decode('ascii'))
+            pending = data[cut:]
+        fw.write(base64.b64encode(pending).decode('ascii'))
+        return
+
+    # text : 물리 단위(mV) 소수 문자열
+    for i, chunk in enumerate(chunks):
+        if i > 0:
+            fw.write(',')
+        physical = (chunk.astype(np.float64) - baseline) / gain
+        fw.write(','.join(np.char.mod('%.6g', physical)))
+
+
+def _channel_attributes(header, channel, encoding):
+    attributes = {
+        'lead': channel + 1,
+        'name': header.sig_name[channel],
+        'units': header.units[channel],
+        'encoding': f"base64-int{_payload_dtype(header, channel).itemsize * 8}le" if encoding == 'base64' else 'text',
+    }
+    # base64는 digital 값이므로 물리 단위 변환용 gain / baseline 함께 기록 (mV = (value - baseline) / gain)
+    if encoding == 'base64':
+        attributes['gain'] = header.adc_gain[channel]
+        attributes['baseline'] = header.baseline[channel]
+    return attributes
+
+
+def export_waveform_xml(record_path, xml_path, encoding='base64', chunk_size=DEFAULT_CHUNK_SIZE):
+    header = wfdb.rdheader(record_path)
+    with open(xml_path, 'w', encoding='utf-8') as fw:
+        fw.write(f'<data record={quoteattr(header.record_name)} fs="{header.fs}" length="{header.sig_len}">\n')
+        for channel in range(header.n_sig):
+            attributes = ' '.join(f'{key}={quoteattr(str(value))}'
+                                  for key, value in _channel_attributes(header, channel, encoding).items())
+            fw.write(f'<WaveformData {attributes}>')
+            _write_channel_data(fw, record_path, header, channel, encoding, chunk_size)
+            fw.write('</WaveformData>\n')
+        fw.write('</data>\n')
+    return xml_path
+
+
+def export_waveform_json(record_path, json_path, encoding='base64', chunk_size=DEFAULT_CHUNK_SIZE):
+    header = wfdb.rdheader(record_path)
+    with open(json_path, 'w', encoding='utf-8') as fw:
+        fw.write(f'{{"record": {json.dumps(header.record_name)}, "fs": {json.dumps(header.fs)}, '
+                 f'"length": {header.sig_len}, "leads": [')
+        for channel in range(header.n_sig):
+            if channel > 0:
+                fw.write(', ')
+            attributes = json.dumps(_channel_attributes(header, channel, encoding))
+            # 마지막 '}' 앞에 data 필드를 스트리밍으로 추가
+            fw.write(attributes[:-1] + (', "data": "' if encoding == 'base64' else ', "data": ['))
+            _write_channel_data(fw, record_path, header, channel, encoding, chunk_size)
+            fw.write('"}' if encoding == 'base64' else ']}')
+        fw.write(']}\n')
+    return json_path
+
+
+# WFDB 레코드(.hea/.dat 또는 SIG)를 XML/JSON으로 내보내기
+def export_waveform(record_path, output_dir, fmt='xml', encoding='base64', chunk_size=DEFAULT_CHUNK_SIZE):
+    if encoding not in ('base64', 'text'):
+        raise ValueError(f"encoding은 'base64' 또는 'text'여야 합니다. encoding : {encoding}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{os.path.basename(record_path)}.{fmt}")
+    if fmt == 'xml':
+        return export_waveform_xml(record_path, output_path, encoding, chunk_size)
+    if fmt == 'json':
+        return export_waveform_json(record_path, output_path, encoding, chunk_size)
+    raise ValueError(f"지원하지 않는 형식입니다. fmt : {fmt}")
@@ -1,4 +1,5 @@
 from glob import glob
+from datetime import datetime
 import xml.etree.ElementTree as ET
 import csv
 
@@ -60,4 +61,12 @@ def xml_to_csv(xml_paths):
     
     tag_list = preprocessing_tag_list(tag_list)
     
-    return tag_list, elements_list
\ No newline at end of file
+    return tag_list, elements_list
+
+# Report XML의 Hookup 날짜/시각을 datetime으로 변환
+def read_hookup_datetime(xml_path):
+    root = ET.parse(xml_path).getroot()
+    item = root.find('PatientInfo')
+    hookup_date = item.find('HookupDate').text
+    hookup_time = item.find('HookupTime').text
+    return datetime.strptime(f"{hookup_time} {hookup_date}", "%H:%M:%S %d-%b-%Y")